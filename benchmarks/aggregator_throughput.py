@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how many statsd lines per second the aggregator takes in, with a local
+load generator sending datagrams over UDP.
+
+    $ PYTHONPATH=. python benchmarks/aggregator_throughput.py
+
+Reports the parse/aggregate rate on its own and the end to end rate through a
+socket, lines that were dropped by the kernel are not counted.
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import socket
+import sys
+import time
+from threading import Thread
+
+# External Libraries
+from measure.aggregator import (
+    Aggregator,
+    AggregatorServer,
+)
+from measure.client.base import BaseClient
+
+
+class NullClient(BaseClient):
+
+    def apply_many(self, metrics):
+        pass
+
+
+def datagram(lines_per_datagram):
+    kinds = ('c', 'ms', 'g', 's')
+    lines = [
+        'app.stat_{0}:{1}|{2}|#region:us,status:{3}'.format(i % 50, i, kinds[i % 4], i % 3)
+        for i in range(lines_per_datagram)
+    ]
+    return '\n'.join(lines).encode('utf-8')
+
+
+def parse_rate(data, lines_per_datagram, datagrams):
+    aggregator = Aggregator(NullClient())
+    start = time.time()
+    for _ in range(datagrams):
+        aggregator.feed(data)
+    elapsed = time.time() - start
+    aggregator.flush()
+    return lines_per_datagram * datagrams / elapsed
+
+
+def socket_rate(data, datagrams):
+    aggregator = Aggregator(NullClient())
+    server = AggregatorServer(aggregator, udp=('127.0.0.1', 0), flush_interval=1)
+    server.sockets[0].setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    address = server.address
+    thread = Thread(target=server.serve_forever)
+    thread.start()
+
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.time()
+    for _ in range(datagrams):
+        sender.sendto(data, address)
+    time.sleep(0.2)
+    server.shutdown()
+    thread.join()
+    elapsed = time.time() - start
+
+    return aggregator.lines / elapsed, aggregator.lines
+
+
+def main(lines_per_datagram=20, datagrams=50000):
+    data = datagram(lines_per_datagram)
+    print(sys.version.split()[0])
+    print('{0} lines per {1} byte datagram'.format(lines_per_datagram, len(data)))
+    print('parse and aggregate: {0:>12,.0f} lines/s'.format(parse_rate(data, lines_per_datagram, datagrams)))
+    rate, received = socket_rate(data, datagrams)
+    print('through udp socket:  {0:>12,.0f} lines/s ({1:,} of {2:,} lines received)'.format(
+        rate, received, lines_per_datagram * datagrams))
+
+
+if __name__ == '__main__':
+    main()
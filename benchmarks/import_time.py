@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the cost of `import measure` in a fresh interpreter.
+
+    $ python benchmarks/import_time.py
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import subprocess
+import sys
+
+SCRIPT = '''
+import resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.time()
+{statement}
+elapsed = time.time() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stdout.write('%f %d\\n' % (elapsed, after - before))
+'''
+
+STATEMENTS = [
+    'import measure',
+    'import measure; measure.PyStatsdClient',
+    'import measure; measure.Boto3Client',
+]
+
+
+def run(statement, runs):
+    timings, memory = [], []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(statement=statement)])
+        elapsed, rss = output.split()
+        timings.append(float(elapsed))
+        memory.append(int(rss))
+    timings.sort()
+    memory.sort()
+    return timings[len(timings) // 2], memory[len(memory) // 2]
+
+
+def main(runs=15):
+    for statement in STATEMENTS:
+        elapsed, rss = run(statement, runs)
+        print('{0:<45} {1:8.1f} ms {2:8d} KiB'.format(statement, elapsed * 1000, rss))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Measure how much the sampling profiler slows down a CPU bound workload at
+several sampling intervals.
+
+    $ PYTHONPATH=. python benchmarks/profiler_overhead.py
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import sys
+import time
+
+# External Libraries
+from measure import Stats
+from measure.client.recording import RecordingClient
+from measure.profiler import SamplingProfiler
+
+
+def work(n=300000):
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+def timed(repeat=20):
+    start = time.time()
+    for _ in range(repeat):
+        work()
+    return time.time() - start
+
+
+def main():
+    print(sys.version.split()[0])
+    print('{0:>6} {1:>10} {2:>10}'.format('mode', 'interval', 'overhead'))
+    for mode in ('thread', 'signal'):
+        for interval in (0.1, 0.01, 0.001):
+            # measured before each run, machines drift
+            baseline = min(timed() for _ in range(3))
+            stats = Stats('bench', client=RecordingClient())
+            with SamplingProfiler(stats, interval=interval, mode=mode):
+                elapsed = min(timed() for _ in range(3))
+            print('{0:>6} {1:>10} {2:>9.1%}'.format(mode, interval, elapsed / baseline - 1))
+
+
+if __name__ == '__main__':
+    main()
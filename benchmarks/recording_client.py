@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the cost of recording increments with `RecordingClient` against a
+`MagicMock` client, the usual way tests capture metrics.
+
+    $ PYTHONPATH=. python benchmarks/recording_client.py
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import sys
+import time
+
+# External Libraries
+from measure import (
+    Counter,
+    Stats,
+)
+from measure.client.base import BaseClient
+from measure.client.recording import RecordingClient
+from mock import MagicMock
+
+
+def run(client, increments):
+    stats = Stats('app', Counter('requests', 'doc'), client=client)
+    increment = stats.requests.increment
+    start = time.time()
+    for _ in range(increments):
+        increment()
+    return increments / (time.time() - start)
+
+
+def main(increments=200000):
+    print(sys.version.split()[0])
+    recording = RecordingClient()
+    print('MagicMock:       {0:>12,.0f} increments/s'.format(run(MagicMock(spec=BaseClient), increments)))
+    print('RecordingClient: {0:>12,.0f} increments/s'.format(run(recording, increments)))
+    print('RecordingClient ring: {0:>7,.0f} increments/s'.format(run(RecordingClient(capacity=1024, ring=True), increments)))
+
+    start = time.time()
+    recording.assert_recorded('app.requests', count=increments, total=increments)
+    print('query {0:,} rows: {1:.3f}s'.format(increments, time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
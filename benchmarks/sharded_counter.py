@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Compare increments on thread sharded counters against a counter guarded by a
+shared lock, for an increasing number of threads.
+
+    $ PYTHONPATH=. python benchmarks/sharded_counter.py
+
+Under the GIL neither scales with threads, on a free-threaded build the sharded
+counter should.
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import sys
+import time
+from threading import (
+    Lock,
+    Thread,
+)
+
+# External Libraries
+from measure.stats.shard import CounterShards
+
+
+class LockedCounter(object):
+
+    def __init__(self):
+        self.lock = Lock()
+        self.value = 0
+
+    def record(self, n):
+        with self.lock:
+            self.value += n
+
+    def collect(self):
+        return self.value
+
+
+def run(counter, threads, increments):
+    def work():
+        record = counter.record
+        for _ in range(increments):
+            record(1)
+
+    workers = [Thread(target=work) for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - start
+
+    assert counter.collect() == threads * increments, 'lost increments'
+    return threads * increments / elapsed
+
+
+def main(increments=200000):
+    print(sys.version.split()[0])
+    print('{0:>8} {1:>16} {2:>16}'.format('threads', 'locked ops/s', 'sharded ops/s'))
+    for threads in (1, 2, 4, 8):
+        locked = run(LockedCounter(), threads, increments)
+        sharded = run(CounterShards(), threads, increments)
+        print('{0:>8} {1:>16,.0f} {2:>16,.0f}'.format(threads, locked, sharded))
+
+
+if __name__ == '__main__':
+    main()
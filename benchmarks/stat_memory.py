@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Memory taken by each child stat of a large `TimerDict`.
+
+    $ PYTHONPATH=. python benchmarks/stat_memory.py
+"""
+
+from __future__ import absolute_import, print_function
+
+# Standard Library
+import gc
+import sys
+import tracemalloc
+
+# External Libraries
+from measure import TimerDict
+
+
+def measure_children(n):
+    stat = TimerDict('latency', 'latency by endpoint')
+    keys = ['endpoint_{0}'.format(i) for i in range(n)]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for key in keys:
+        stat[key]
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # names are created per child either way, leave them out
+    names = sum(sys.getsizeof(child.name) for child in stat.values())
+    return (after - before - names) / float(n)
+
+
+def main(n=50000):
+    print(sys.version.split()[0])
+    print('{0:,} children: {1:.0f} bytes per child stat'.format(n, measure_children(n)))
+
+
+if __name__ == '__main__':
+    main()
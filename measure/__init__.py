@@ -2,13 +2,21 @@
 
 from __future__ import absolute_import
 
+# Standard Library
+import sys
+from importlib import import_module
+
 from .stats import (
     Counter,
     CounterDict,
+    Distribution,
+    DistributionDict,
     FakeStat,
     FakeStatDict,
     Gauge,
     GaugeDict,
+    Histogram,
+    HistogramDict,
     Meter,
     MeterDict,
     Stat,
@@ -18,7 +26,18 @@ from .stats import (
     TimerDict,
 )
 
-from .client import (
-    PyStatsdClient,
-    Boto3Client
-)
+
+def __getattr__(name):
+    # clients are loaded lazily, see measure.client
+    client = import_module('.client', __name__)
+
+    if name in client.__all__:
+        return getattr(client, name)
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    from .client import (
+        Boto3Client,
+        PyStatsdClient,
+    )
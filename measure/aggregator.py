@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+A small statsd compatible aggregator to run next to an application.
+
+It receives statsd lines over UDP and/or a unix datagram socket, aggregates
+counters, gauges, timers, sets and distributions per flush window and forwards
+the results with one `apply_many` call through any `BaseClient`.
+
+    $ measure-aggregator --udp 127.0.0.1:8125 --client measure.client.Boto3Client
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import argparse
+import errno
+import os
+import select
+import signal
+import socket
+import time
+from array import array
+from importlib import import_module
+from logging import (
+    basicConfig,
+    getLogger,
+)
+from threading import (
+    Event,
+    Lock,
+)
+
+# External Libraries
+from measure.client.base import Metric
+from measure.client.resolver import CachedResolver
+from measure.sketch import DDSketch
+from measure.tags import intern_tags
+
+
+logger = getLogger(__name__)
+
+
+class Parser(object):
+    """
+    Parses datagrams of newline separated statsd lines.
+
+        name:value|type[|@sample_rate][|#tag:value,...]
+
+    Names and tag sets are decoded once and cached, `max_cached` bounds the caches.
+    Names are made valid with `name_policy` when they are first seen.
+    """
+
+    max_cached = 100000
+
+    def __init__(self, name_policy=None):
+        self.name_policy = name_policy
+        self._names = {}
+        self._tags = {}
+        self.errors = 0
+
+    def name(self, raw):
+        try:
+            return self._names[raw]
+        except KeyError:
+            if len(self._names) >= self.max_cached:
+                self._names.clear()
+            name = raw.decode('utf-8')
+            if self.name_policy is not None:
+                name = self.name_policy.sanitize(name)
+            self._names[raw] = name
+            return name
+
+    def tags(self, raw):
+        try:
+            return self._tags[raw]
+        except KeyError:
+            if len(self._tags) >= self.max_cached:
+                self._tags.clear()
+            pairs = []
+            for tag in raw.decode('utf-8').split(','):
+                key, _, value = tag.partition(':')
+                pairs.append((key, value if _ else None))
+            tags = self._tags[raw] = intern_tags(pairs)
+            return tags
+
+    def parse(self, data):
+        """
+        :param bytes data: one datagram.
+        :returns: a list of `(name, value, type, sample_rate, tags)`, values are still bytes.
+        """
+        parsed = []
+        append = parsed.append
+        for line in data.split(b'\n'):
+            if not line:
+                continue
+
+            name, _, rest = line.partition(b':')
+            fields = rest.split(b'|')
+            if len(fields) < 2 or not name:
+                self.errors += 1
+                continue
+
+            sample_rate, tags = 1, None
+            try:
+                name = self.name(name)
+                for field in fields[2:]:
+                    if field.startswith(b'@'):
+                        sample_rate = float(field[1:])
+                    elif field.startswith(b'#'):
+                        tags = self.tags(field[1:])
+            except (ValueError, UnicodeDecodeError):
+                self.errors += 1
+                continue
+
+            append((name, fields[0], fields[1], sample_rate, tags))
+        return parsed
+
+
+def decode_sketch(value):
+    try:
+        return DDSketch.from_string(value)
+    except Exception:
+        raise ValueError('invalid sketch')
+
+
+class Aggregator(object):
+    """
+    Aggregates parsed statsd lines per flush window.
+
+    Counters are summed (scaled by their sample rate), gauges keep the last
+    value (`+n` and `-n` change it), timers keep every value and sets count
+    their unique members. Gauges remember their value across windows but are
+    only forwarded for windows they were set in.
+
+    Distributions are merged into one sketch per name: `|dds` lines carry a
+    sketch encoded by `DDSketch.to_string` and `|d` lines a single value.
+    """
+
+    def __init__(self, client):
+        """
+        :param BaseClient client: the client the aggregates are forwarded through.
+        """
+        self.client = client
+        self.parser = Parser(getattr(client.__class__, 'name_policy', None))
+        self.lines = 0
+        self._lock = Lock()
+        self._gauge_values = {}
+        self._counters = {}
+        self._gauges = set()
+        self._timers = {}
+        self._sets = {}
+        self._sketches = {}
+
+    def feed(self, data):
+        """
+        Parse and aggregate one datagram.
+        """
+        parsed = self.parser.parse(data)
+        with self._lock:
+            for name, value, kind, sample_rate, tags in parsed:
+                try:
+                    self._add((name, tags), value, kind, sample_rate)
+                except (KeyError, ValueError):
+                    self.parser.errors += 1
+                else:
+                    self.lines += 1
+        return len(parsed)
+
+    def _add(self, key, value, kind, sample_rate):
+        if kind == b'c':
+            self._counters[key] = self._counters.get(key, 0) + float(value) / sample_rate
+        elif kind == b'ms' or kind == b'h':
+            try:
+                self._timers[key].append(float(value))
+            except KeyError:
+                self._timers[key] = array('d', [float(value)])
+        elif kind == b'g':
+            if value[:1] in (b'+', b'-'):
+                self._gauge_values[key] = self._gauge_values.get(key, 0) + float(value)
+            else:
+                self._gauge_values[key] = float(value)
+            self._gauges.add(key)
+        elif kind == b's':
+            self._sets.setdefault(key, set()).add(value)
+        elif kind == b'dds':
+            self._merge_sketch(key, decode_sketch(value))
+        elif kind == b'd':
+            sketch = DDSketch()
+            sketch.add(float(value))
+            self._merge_sketch(key, sketch)
+        else:
+            raise KeyError(kind)
+
+    def _merge_sketch(self, key, sketch):
+        try:
+            self._sketches[key].merge(sketch)
+        except KeyError:
+            self._sketches[key] = sketch
+
+    def collect(self):
+        """
+        Take the aggregates of the current window.
+
+        :returns: a list of `Metric`.
+        """
+        with self._lock:
+            counters, gauges, timers, sets = self._counters, self._gauges, self._timers, self._sets
+            self._counters, self._gauges, self._timers, self._sets = {}, set(), {}, {}
+            sketches, self._sketches = self._sketches, {}
+            gauges = [(key, self._gauge_values[key]) for key in gauges]
+
+        metrics = []
+        for (name, tags), value in counters.items():
+            metrics.append(Metric('update_stats', name, value, 1, tags))
+        for (name, tags), value in gauges:
+            metrics.append(Metric('gauge', name, value, 1, tags))
+        for (name, tags), values in timers.items():
+            metrics.append(Metric('timing_many', name, values, 1, tags))
+        for (name, tags), members in sets.items():
+            metrics.append(Metric('gauge', name, len(members), 1, tags))
+        for (name, tags), sketch in sketches.items():
+            metrics.append(Metric('distribution', name, sketch, 1, tags))
+        return metrics
+
+    def flush(self):
+        """
+        Forward the aggregates of the current window through the client.
+
+        :returns: the number of metrics forwarded.
+        """
+        metrics = self.collect()
+        if metrics:
+            try:
+                self.client.apply_many(metrics)
+            except Exception:
+                logger.exception('could not forward %d metrics', len(metrics))
+        return len(metrics)
+
+
+class AggregatorServer(object):
+    """
+    Receives statsd datagrams on UDP and/or unix sockets and flushes an
+    `Aggregator` every `flush_interval` seconds.
+    """
+
+    max_datagram_size = 65535
+
+    def __init__(self, aggregator, udp=None, unix=None, flush_interval=10):
+        """
+        :param Aggregator aggregator: what the datagrams are fed to.
+        :param tuple udp: the `(host, port)` to listen on.
+        :param str unix: the path of a unix datagram socket to listen on.
+        :param float flush_interval: seconds between flushes.
+        """
+        self.aggregator = aggregator
+        self.flush_interval = flush_interval
+        self.unix = unix
+        self.sockets = []
+        self._stopped = Event()
+
+        if udp is not None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(udp)
+            self.sockets.append(sock)
+
+        if unix is not None:
+            if os.path.exists(unix):
+                os.unlink(unix)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(unix)
+            self.sockets.append(sock)
+
+        for sock in self.sockets:
+            sock.setblocking(False)
+
+    @property
+    def address(self):
+        return self.sockets[0].getsockname()
+
+    def serve_forever(self):
+        next_flush = time.time() + self.flush_interval
+        try:
+            while not self._stopped.is_set():
+                timeout = max(0, next_flush - time.time())
+                try:
+                    readable, _, _ = select.select(self.sockets, [], [], min(timeout, 0.5))
+                except select.error as error:
+                    # Python 2 does not retry when a signal handler ran, e.g. to shut down
+                    if error.args[0] != errno.EINTR:
+                        raise
+                    continue
+                for sock in readable:
+                    self.drain(sock)
+
+                if time.time() >= next_flush:
+                    self.aggregator.flush()
+                    next_flush += self.flush_interval
+        finally:
+            self.aggregator.flush()
+            self.close()
+
+    def drain(self, sock):
+        """
+        Read every datagram waiting on a socket.
+        """
+        feed = self.aggregator.feed
+        while True:
+            try:
+                data = sock.recv(self.max_datagram_size)
+            except socket.error:
+                return
+            feed(data)
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def close(self):
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
+        if self.unix is not None and os.path.exists(self.unix):
+            os.unlink(self.unix)
+
+
+def import_client(path, **kwargs):
+    module_path, name = path.rsplit('.', 1)
+    return getattr(import_module(module_path), name)(**kwargs)
+
+
+def forward_addresses(client):
+    """
+    The `(ip, port)` each statsd server a client sends to, empty for other clients.
+    """
+    clients = getattr(client, 'clients', None)
+    clients = list(clients.values()) if isinstance(clients, dict) else [client]
+    return [
+        (sub.resolver.address[0], int(sub.resolver.address[1]))
+        for sub in clients
+        if isinstance(getattr(sub, 'resolver', None), CachedResolver)
+    ]
+
+
+def is_loop(udp, addresses):
+    """
+    Whether forwarding to one of `addresses` would send to the `(host, port)` listened on.
+    """
+    host, port = udp
+    wildcard = host in ('', '0.0.0.0')
+    listening = set(info[4][0] for info in socket.getaddrinfo(host or None, port, socket.AF_INET, socket.SOCK_DGRAM))
+    return any(
+        forward_port == port and (ip in listening or (wildcard and ip.startswith('127.')))
+        for ip, forward_port in addresses
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aggregate statsd lines and forward them with a measure client.')
+    parser.add_argument('--udp', default='127.0.0.1:8125', help='host:port to listen on, empty to disable')
+    parser.add_argument('--unix', default=None, help='path of a unix datagram socket to listen on')
+    parser.add_argument('--flush-interval', type=float, default=10, help='seconds between flushes')
+    parser.add_argument('--client', required=True, help='class path of the client to forward with')
+    parser.add_argument(
+        '--client-option', action='append', default=[], metavar='KEY=VALUE',
+        help='keyword argument for the client, may be repeated, statsd clients need host (and port)',
+    )
+    parser.add_argument(
+        '--shutdown-timeout', type=float, default=5,
+        help='seconds to wait at exit for the client to send the last window',
+    )
+    args = parser.parse_args(argv)
+
+    basicConfig(level='INFO')
+
+    udp = None
+    if args.udp:
+        host, _, port = args.udp.rpartition(':')
+        udp = host, int(port)
+
+    options = dict(option.split('=', 1) for option in args.client_option)
+    client = import_client(args.client, **options)
+
+    addresses = forward_addresses(client)
+    if addresses and 'host' not in options:
+        # statsd clients default to localhost:8125, where the aggregator itself usually listens
+        parser.error('pass the statsd server to forward to with --client-option host=... [--client-option port=...]')
+    if udp is not None and is_loop(udp, addresses):
+        parser.error('the client forwards to {0}, which the aggregator listens on'.format(args.udp))
+
+    server = AggregatorServer(Aggregator(client), udp=udp, unix=args.unix, flush_interval=args.flush_interval)
+
+    logger.info('aggregating on %s, forwarding with %s', [sock.getsockname() for sock in server.sockets], args.client)
+
+    # sidecars are stopped with SIGTERM, flush the last window then
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: server.shutdown())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    # clients may send from daemon threads, which die with the process
+    dropped = client.close(args.shutdown_timeout)
+    if dropped:
+        logger.warning('%s metrics were not forwarded before the shutdown timeout', dropped)
+
+
+if __name__ == '__main__':
+    main()
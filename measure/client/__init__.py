@@ -2,12 +2,35 @@
 
 from __future__ import absolute_import
 
+# Standard Library
+import sys
+from importlib import import_module
 
-from .boto3 import Boto3Client
-from .pystatsd import PyStatsdClient
-from .test import TestStatsdClient
 
-# remove clients that don't exist
-for name, client in globals().items():
-    if isinstance(client, type) and issubclass(client, NotImplementedError):
-        del name
+# clients are imported on first access, keyed by the module they live in
+_clients = {
+    'Boto3Client': '.boto3',
+    'PyStatsdClient': '.pystatsd',
+    'RecordingClient': '.recording',
+    'ShardedClient': '.sharded',
+    'TestStatsdClient': '.test',
+}
+
+__all__ = sorted(_clients)
+
+
+def __getattr__(name):
+    try:
+        module = _clients[name]
+    except KeyError:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+
+    client = globals()[name] = getattr(import_module(module, __name__), name)
+    return client
+
+
+if sys.version_info < (3, 7):
+    # module level __getattr__ needs PEP 562, the client modules defer their own
+    # third party imports so importing them eagerly is still cheap.
+    for _name in _clients:
+        __getattr__(_name)
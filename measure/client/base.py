@@ -2,9 +2,22 @@
 
 from __future__ import absolute_import
 
+# Standard Library
+from collections import namedtuple
+from logging import getLogger
+
+
+logger = getLogger(__name__)
+
+Metric = namedtuple('Metric', 'function name value sample_rate tags')
+Metric.__new__.__defaults__ = (None,)
+
 
 class BaseClient(object):
 
+    # the `NamePolicy` keeping names valid for the backend, `None` sends names as they are
+    name_policy = None
+
     def timing(self, *args, **kwargs):
         raise NotImplementedError('timing must be implemented in client')
 
@@ -16,3 +29,55 @@ class BaseClient(object):
 
     def send(self, *args, **kwargs):
         raise NotImplementedError('send must be implemented in client')
+
+    def distribution(self, name, sketch, sample_rate=1, tags=None):
+        """
+        Send a `DDSketch`, clients that can not send sketches drop them.
+        """
+        cls = type(self)
+        if not getattr(cls, '_warned_distribution', False):
+            cls._warned_distribution = True
+            logger.warning('%s can not send distributions, they are dropped', cls.__name__)
+
+    def timing_many(self, name, values, sample_rate=1, tags=None):
+        """
+        Send many timings for one stat, clients that can send them in one call
+        should override this.
+        """
+        self.apply_many([Metric('timing', name, value, sample_rate, tags) for value in values])
+
+    def apply_many(self, metrics):
+        """
+        Send a batch of metrics, clients that can send more than one metric
+        per call should override this.
+
+        A metric that fails is logged and the others are still sent.
+
+        :param list metrics: a list of `Metric` tuples.
+        """
+        for metric in metrics:
+            try:
+                func = getattr(self, metric.function)
+                if metric.tags is None:
+                    func(metric.name, metric.value, sample_rate=metric.sample_rate)
+                else:
+                    func(metric.name, metric.value, sample_rate=metric.sample_rate, tags=metric.tags)
+            except Exception:
+                logger.exception('could not send %s with %s', metric.name, metric.function)
+
+    def flush(self, timeout=None):
+        """
+        Send whatever the client buffers, clients that buffer should override this.
+
+        :param float timeout: seconds to wait at most, `None` waits until done.
+        :returns: the number of metrics still buffered.
+        """
+        return 0
+
+    def close(self, timeout=None):
+        """
+        Flush and release the client's resources.
+
+        :returns: the number of metrics dropped.
+        """
+        return self.flush(timeout)
@@ -2,25 +2,94 @@
 from __future__ import absolute_import
 
 # Standard Library
+from collections import OrderedDict
 from os import environ
 
 # External Libraries
 from measure.client.base import BaseClient
+from measure.client.executor import (
+    Executor,
+    TokenBucket,
+)
+from measure.names import CloudWatchNamePolicy
+from measure.vectors import summarize
 
 
-try:
-    import boto3
-except ImportError:
-    boto3_Client = NotImplementedError
+def is_retryable(error):
+    """
+    Whether a failed CloudWatch call is worth retrying: throttling and server side errors.
+    """
+    response = getattr(error, 'response', None) or {}
+    code = response.get('Error', {}).get('Code')
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+    return code in Boto3Client.retryable_codes or status >= 500
+
+
+def coarsen(bins, size):
+    """
+    Merge neighbouring `(value, count)` bins until there are at most `size`,
+    each merged bin is represented by its count weighted mean.
+    """
+    if len(bins) <= size:
+        return bins
+
+    step = -(-len(bins) // size)
+    coarse = []
+    for start in range(0, len(bins), step):
+        chunk = bins[start:start + step]
+        count = sum(n for _, n in chunk)
+        coarse.append((sum(value * n for value, n in chunk) / count, count))
+    return coarse
 
 
 class Boto3Client(BaseClient):
+    """
+    Sends metrics to CloudWatch.
+
+    `put_metric_data` calls are made by `workers` background threads sharing
+    one botocore client, rate limited to `requests_per_second` and retried with
+    jitter when throttled, so callers never wait on the network. Pass
+    `workers=0` to send synchronously.
+    """
+
+    # CloudWatch units by client function
+    units = {
+        'timing': 'Seconds',
+        'timing_many': 'Seconds',
+    }
+
+    # the most datums put_metric_data accepts in one call
+    max_batch_size = 20
+
+    # the most Values a datum may have, sketches with more buckets are coarsened
+    max_datum_values = 150
+
+    name_policy = CloudWatchNamePolicy()
+
+    # a conservative share of the PutMetricData quota, which is per account and region
+    requests_per_second = 150
+
+    # error codes of calls that are retried
+    retryable_codes = frozenset([
+        'Throttling',
+        'ThrottlingException',
+        'RequestLimitExceeded',
+        'ServiceUnavailable',
+        'InternalFailure',
+    ])
+
     def __init__(
         self,
         aws_access_key_id=None,
         aws_secret_access_key=None,
-        region_name=None
+        region_name=None,
+        workers=2,
+        max_queue_size=10000,
     ):
+        """
+        :param int workers: the number of threads sending to CloudWatch, `0` sends in the caller's thread.
+        :param int max_queue_size: calls queued past this are dropped.
+        """
         if not any([aws_access_key_id, aws_secret_access_key]):
             try:
                 aws_access_key_id = environ['AWS_ACCESS_KEY_ID']
@@ -30,12 +99,31 @@ class Boto3Client(BaseClient):
 
         region_name = region_name or environ.get('AWS_DEFAULT_REGION', None) or 'us-east-1'
 
+        # importing boto3 is slow, only pay for it when the client is used
+        import boto3
+        from botocore.config import Config
+
         session = boto3.Session(
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             region_name=region_name
         )
-        self.client = session.client('cloudwatch')
+        # botocore clients are thread safe, the workers share this one and its connection pool
+        self.client = session.client('cloudwatch', config=Config(
+            max_pool_connections=max(workers, 1),
+            # retries are done by the executor, with jitter and without holding a worker's place in the rate limit
+            retries={'max_attempts': 0},
+        ))
+
+        self.executor = None
+        if workers:
+            self.executor = Executor(
+                self._put_metric_data,
+                workers=workers,
+                max_queue_size=max_queue_size,
+                bucket=TokenBucket(self.requests_per_second),
+                retryable=is_retryable,
+            )
 
     def split_prefix_name(self, prefix_name):
         parts = prefix_name.split('.')
@@ -43,34 +131,136 @@ class Boto3Client(BaseClient):
         name = parts[-1:][0]
         return ".".join(prefix), name
 
-    def submit_metric(self, namespace, metric_name, value, unit='None'):
+    def submit_metric(self, namespace, metric_name, value, unit='None', tags=None):
+        self.submit_datum(namespace, {
+            'MetricName': metric_name,
+            'Value': value,
+            'Unit': unit
+        }, tags)
+
+    def submit_datum(self, namespace, datum, tags=None):
+        if tags is not None:
+            datum['Dimensions'] = tags.dimensions
+        self.put_metric_data(namespace, [datum])
+
+    def put_metric_data(self, namespace, data):
+        """
+        Queue a `put_metric_data` call, or make it if there are no workers.
+        """
+        if self.executor is None:
+            self._put_metric_data(namespace, data)
+        else:
+            # a copy, the caller may reuse its list before a worker sends it
+            self.executor.submit(namespace, list(data))
+
+    def _put_metric_data(self, namespace, data):
         self.client.put_metric_data(
             Namespace=namespace,
-            MetricData=[
-                {
-                    'MetricName': metric_name,
-                    'Value': value,
-                    'Unit': unit
-                }
-            ]
+            MetricData=data
         )
 
-    def timing(self, prefix_name, value, sample_rate=None):
+    def flush(self, timeout=None):
+        """
+        Wait for queued calls, what is left is counted in `put_metric_data` calls.
+        """
+        if self.executor is None:
+            return 0
+        return self.executor.flush(timeout)
+
+    def close(self, timeout=None):
+        if self.executor is None:
+            return 0
+        return self.executor.close(timeout)
+
+    def timing(self, prefix_name, value, sample_rate=None, tags=None):
+        namespace, metric_name = self.split_prefix_name(prefix_name)
+        self.submit_metric(namespace, metric_name, value, unit='Seconds', tags=tags)
+
+    def make_datum(self, metric_name, function, value, tags=None):
+        """
+        Build the CloudWatch datum for a value sent with a client function.
+
+        Many timings are sent as a single statistic set and a distribution's
+        sketch buckets as `Values` and `Counts`.
+        """
+        if function == 'distribution':
+            bins = coarsen(value.bins(), self.max_datum_values)
+            if not bins:
+                return None
+            datum = {
+                'MetricName': metric_name,
+                'Values': [bin_value for bin_value, _ in bins],
+                'Counts': [float(count) for _, count in bins],
+                'Unit': self.units.get(function, 'None')
+            }
+        elif function == 'timing_many':
+            count, total, minimum, maximum = summarize(value)
+            if not count:
+                return None
+            datum = {
+                'MetricName': metric_name,
+                'StatisticValues': {
+                    'SampleCount': float(count),
+                    'Sum': float(total),
+                    'Minimum': float(minimum),
+                    'Maximum': float(maximum),
+                },
+                'Unit': self.units[function]
+            }
+        else:
+            datum = {
+                'MetricName': metric_name,
+                'Value': value,
+                'Unit': self.units.get(function, 'None')
+            }
+
+        if tags is not None:
+            datum['Dimensions'] = tags.dimensions
+        return datum
+
+    def timing_many(self, prefix_name, values, sample_rate=None, tags=None):
         namespace, metric_name = self.split_prefix_name(prefix_name)
-        self.submit_metric(namespace, metric_name, value, unit='Seconds')
+        datum = self.make_datum(metric_name, 'timing_many', values, tags)
+        if datum is not None:
+            self.submit_datum(namespace, datum)
 
-    def update_stats(self, prefix_name, value, sample_rate=None):
+    def distribution(self, prefix_name, sketch, sample_rate=None, tags=None):
         namespace, metric_name = self.split_prefix_name(prefix_name)
-        self.submit_metric(namespace, metric_name, value, unit='None')
+        datum = self.make_datum(metric_name, 'distribution', sketch, tags)
+        if datum is not None:
+            self.submit_datum(namespace, datum)
+
+    def apply_many(self, metrics):
+        """
+        Send a batch with as few `put_metric_data` calls as possible, one per
+        namespace and `max_batch_size` datums.
+        """
+        namespaces = OrderedDict()
+        for metric in metrics:
+            namespace, metric_name = self.split_prefix_name(metric.name)
+            datum = self.make_datum(metric_name, metric.function, metric.value, metric.tags)
+            if datum is not None:
+                namespaces.setdefault(namespace, []).append(datum)
+
+        for namespace, data in namespaces.items():
+            for start in range(0, len(data), self.max_batch_size):
+                self.put_metric_data(namespace, data[start:start + self.max_batch_size])
 
-    def guage(self, prefix_name, value, sample_rate=None):
+    def update_stats(self, prefix_name, value, sample_rate=None, tags=None):
         namespace, metric_name = self.split_prefix_name(prefix_name)
-        self.submit_metric(namespace, metric_name, value, unit='None')
+        self.submit_metric(namespace, metric_name, value, unit='None', tags=tags)
+
+    def gauge(self, prefix_name, value, sample_rate=None, tags=None):
+        namespace, metric_name = self.split_prefix_name(prefix_name)
+        self.submit_metric(namespace, metric_name, value, unit='None', tags=tags)
+
+    # the old misspelled name, kept for callers using it
+    guage = gauge
 
-    def send(self, prefix_name, value, sample_rate=None):
+    def send(self, prefix_name, value, sample_rate=None, tags=None):
         namespace, metric_name = self.split_prefix_name(prefix_name)
-        self.submit_metric(namespace, metric_name, value, unit='None')
+        self.submit_metric(namespace, metric_name, value, unit='None', tags=tags)
 
-    def mark(self, prefix_name, value, sample_rate=None):
+    def mark(self, prefix_name, value, sample_rate=None, tags=None):
         namespace, metric_name = self.split_prefix_name(prefix_name)
-        self.submit_metric(namespace, metric_name, value, unit='None')
+        self.submit_metric(namespace, metric_name, value, unit='None', tags=tags)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import random
+from logging import getLogger
+from threading import (
+    Lock,
+    Thread,
+)
+from time import (
+    sleep,
+    time,
+)
+
+
+try:
+    from queue import (
+        Full,
+        Queue,
+    )
+except ImportError:
+    from Queue import (
+        Full,
+        Queue,
+    )
+
+
+logger = getLogger(__name__)
+
+_stop = object()
+
+
+class TokenBucket(object):
+    """
+    Allows `rate` calls per second on average and bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.tokens = self.burst
+        self._updated = time()
+        self._lock = Lock()
+
+    def delay(self):
+        """
+        Take a token.
+
+        :returns: the seconds to wait before using it.
+        """
+        with self._lock:
+            now = time()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """
+        Take a token, waiting until it is available.
+        """
+        wait = self.delay()
+        if wait:
+            sleep(wait)
+
+
+class Executor(object):
+    """
+    Runs calls on a small pool of daemon threads so callers never wait on
+    the network.
+
+    Calls are queued, a full queue drops new calls, as does a closed executor.
+    Each call waits for a
+    token from `bucket` and calls failing with an error `retryable` accepts
+    are retried with exponential backoff and full jitter.
+
+        >>> executor = Executor(client.put_metric_data, workers=2, bucket=TokenBucket(150))
+        >>> executor.submit(Namespace='app', MetricData=data)
+    """
+
+    def __init__(self, func, workers=2, max_queue_size=10000, bucket=None, retryable=None, retries=3, backoff=0.1):
+        """
+        :param callable func: what is called with the submitted arguments.
+        :param int workers: the number of threads.
+        :param int max_queue_size: calls queued past this are dropped.
+        :param TokenBucket bucket: rate limits the calls, `None` does not limit them.
+        :param callable retryable: takes an exception and tells whether to retry the call.
+        :param int retries: the most times a call is retried.
+        :param float backoff: seconds to wait before the first retry, it doubles after each.
+        """
+        self.func = func
+        self.bucket = bucket
+        self.retryable = retryable or (lambda error: False)
+        self.retries = retries
+        self.backoff = backoff
+        # calls dropped because the queue was full or they kept failing
+        self.dropped = 0
+        self.queue = Queue(max_queue_size)
+        self.threads = []
+        self.closed = False
+        self._lock = Lock()
+
+        for i in range(workers):
+            thread = Thread(target=self._run, name='measure-executor-{0}'.format(i))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, *args, **kwargs):
+        # under the lock `close` stops the threads with, so nothing is queued after them
+        with self._lock:
+            if self.closed:
+                self._drop('the executor is closed, calls are being dropped')
+                return
+            try:
+                self.queue.put_nowait((args, kwargs))
+            except Full:
+                self._drop('the queue is full, calls are being dropped')
+
+    def _drop(self, message):
+        self.dropped += 1
+        if self.dropped == 1:
+            logger.warning(message)
+
+    def call(self, *args, **kwargs):
+        """
+        Make one call in this thread, rate limited and with retries.
+
+        :returns: whether the call succeeded.
+        """
+        for attempt in range(self.retries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                self.func(*args, **kwargs)
+                return True
+            except Exception as error:
+                if attempt == self.retries or not self.retryable(error):
+                    logger.exception('call failed after %d attempts', attempt + 1)
+                    self.dropped += 1
+                    return False
+            sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def _run(self):
+        queue = self.queue
+        while True:
+            item = queue.get()
+            try:
+                if item is _stop:
+                    return
+                args, kwargs = item
+                self.call(*args, **kwargs)
+            finally:
+                queue.task_done()
+
+    def flush(self, timeout=None):
+        """
+        Wait for the queued calls to finish.
+
+        :param float timeout: seconds to wait at most, `None` waits until done.
+        :returns: the number of calls still queued or running.
+        """
+        queue = self.queue
+        if not self.threads:
+            # nothing would ever run them, calls queued when closing were counted then
+            return 0 if self.closed else queue.unfinished_tasks
+
+        deadline = None if timeout is None else time() + timeout
+        with queue.all_tasks_done:
+            while queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time()
+                if remaining is not None and remaining <= 0:
+                    break
+                queue.all_tasks_done.wait(remaining)
+            return queue.unfinished_tasks
+
+    def close(self, timeout=None):
+        """
+        Finish the queued calls and stop the threads, calls submitted later
+        are dropped.
+
+        :returns: the number of calls abandoned.
+        """
+        if self.closed:
+            return 0
+        pending = self.flush(timeout)
+        with self._lock:
+            self.closed = True
+            for _ in self.threads:
+                try:
+                    self.queue.put_nowait(_stop)
+                except Full:
+                    break
+            self.threads = []
+        return pending
@@ -2,8 +2,22 @@
 
 from __future__ import absolute_import
 
+# Standard Library
+import random
+import socket
+from logging import getLogger
+from operator import methodcaller
+
 # External Libraries
-from measure.client.base import BaseClient
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.resolver import (
+    CachedResolver,
+    ResolvingSocket,
+)
+from measure.names import StatsdNamePolicy
 
 try:
     from pystatsd import Client as pystatsd_Client
@@ -11,19 +25,122 @@ except ImportError:
     pystatsd_Client = NotImplementedError
 
 
+logger = getLogger(__name__)
+
+
 class PyStatsdClient(BaseClient):
 
-    def __init__(self, host='localhost', port=8125, prefix=None):
+    name_policy = StatsdNamePolicy()
+
+    # statsd line formats for each client function
+    formats = {
+        'timing': '%s:%f|ms',
+        'update_stats': '%s:%s|c',
+        'gauge': '%s:%f|g',
+        'send': '%s:%s|s',
+        'timing_many': '%s:%f|ms',
+        # a base64 encoded `DDSketch`, merged by `measure-aggregator`
+        'distribution': '%s:%s|dds',
+    }
+
+    # how values that are not numbers are written
+    encoders = {
+        'distribution': methodcaller('to_string'),
+    }
+
+    # functions whose value is a sequence of values
+    vector_functions = frozenset(['timing_many'])
+
+    # batches are split into datagrams of at most this many bytes
+    max_packet_size = 1432
+
+    def __init__(self, host='localhost', port=8125, prefix=None, resolve_interval=60):
+        """
+        :param str host: the statsd host, it is resolved once and re-resolved in the background.
+        :param int port: the statsd port.
+        :param str prefix: a prefix for every stat sent.
+        :param float resolve_interval: seconds between re-resolving `host`, `None` disables it.
+        """
         self.client = pystatsd_Client(host, port, prefix)
+        self.resolver = CachedResolver(host, port, refresh_interval=resolve_interval, address=self.client.addr)
+        self.client.udp_sock = ResolvingSocket(self.client.udp_sock, self.resolver)
+
+    def timing(self, stat, value, sample_rate=1, tags=None):
+        if tags is None:
+            self.client.timing(stat, value, sample_rate)
+        else:
+            self.apply_many([Metric('timing', stat, value, sample_rate, tags)])
+
+    def update_stats(self, stat, value, sample_rate=1, tags=None):
+        if tags is None:
+            self.client.update_stats(stat, value, sample_rate)
+        else:
+            self.apply_many([Metric('update_stats', stat, value, sample_rate, tags)])
+
+    def gauge(self, stat, value, sample_rate=1, tags=None):
+        if tags is None:
+            self.client.gauge(stat, value, sample_rate)
+        else:
+            self.apply_many([Metric('gauge', stat, value, sample_rate, tags)])
+
+    def send(self, stat, value, sample_rate=1, tags=None):
+        # pystatsd has no set function, the line is formatted like the others
+        self.apply_many([Metric('send', stat, value, sample_rate, tags)])
+
+    def distribution(self, stat, sketch, sample_rate=1, tags=None):
+        self.apply_many([Metric('distribution', stat, sketch, sample_rate, tags)])
+
+    def timing_many(self, name, values, sample_rate=1, tags=None):
+        self.apply_many([Metric('timing_many', name, values, sample_rate, tags)])
+
+    def apply_many(self, metrics):
+        """
+        Send a batch of metrics packed into as few datagrams as possible.
+        """
+        prefix = self.client.prefix
+        lines = []
+        for metric in metrics:
+            line_format = self.formats[metric.function]
+            values = metric.value if metric.function in self.vector_functions else (metric.value,)
+            if metric.function in self.encoders:
+                values = [self.encoders[metric.function](value) for value in values]
+
+            if metric.sample_rate < 1:
+                line_format += '|@%s' % metric.sample_rate
+                values = [value for value in values if random.random() <= metric.sample_rate]
+
+            # the tag suffix is encoded once per tag set
+            suffix = '' if metric.tags is None else metric.tags.statsd
+
+            for value in values:
+                line = line_format % (metric.name, value) + suffix
+                lines.append(prefix + '.' + line if prefix else line)
 
-    def timing(self, *args, **kwargs):
-        self.client.timing(*args, **kwargs)
+        for packet in self.pack(lines):
+            try:
+                self.client.udp_sock.sendto(packet, self.resolver.address)
+            except socket.error:
+                logger.exception('could not send %d bytes of metrics', len(packet))
 
-    def update_stats(self, *args, **kwargs):
-        self.client.update_stats(*args, **kwargs)
+    def close(self, timeout=None):
+        dropped = super(PyStatsdClient, self).close(timeout)
+        self.resolver.stop()
+        # the socket is left open, it buffers nothing and an application still
+        # running after a signal drained it keeps sending with the last address
+        return dropped
 
-    def gauge(self, *args, **kwargs):
-        self.client.gauge(*args, **kwargs)
+    def pack(self, lines):
+        """
+        Join statsd lines into newline separated datagrams.
+        """
+        packet, size = [], 0
+        for line in lines:
+            line = line.encode('utf-8')
+            if packet and size + len(line) + 1 > self.max_packet_size:
+                yield b'\n'.join(packet)
+                packet, size = [], 0
+            packet.append(line)
+            size += len(line) + 1
 
-    def send(self, *args, **kwargs):
-        self.client.send(*args, **kwargs)
+        if packet:
+            yield b'\n'.join(packet)
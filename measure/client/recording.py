@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from array import array
+from collections import namedtuple
+from itertools import chain
+from threading import Lock
+from time import time
+
+# External Libraries
+from measure.client.base import BaseClient
+from measure.sketch import DDSketch
+from measure.vectors import summarize
+
+
+Emission = namedtuple('Emission', 'function name value timestamp tags')
+
+
+class RecordingClient(BaseClient):
+    """
+    Records every emission in memory so tests and in process benchmarks can
+    check what was sent.
+
+    Emissions are stored in preallocated columns (`array.array`) of interned
+    name, function and tag set ids, values and timestamps, recording one costs
+    a few array stores. Once `capacity` emissions are recorded the columns
+    double, or with `ring=True` the oldest emissions are overwritten.
+
+        >>> client = RecordingClient()
+        >>> stats = Stats('app', Counter('requests', 'doc'), client=client)
+        >>> stats.requests.increment()
+        >>> client.total('app.requests')
+        1.0
+
+    Set members that are not numbers are recorded as interned ids, so
+    `unique` still counts them. Distributions are recorded with their count as
+    value and their sketches are merged per name in `sketches`, like an
+    aggregator would.
+    """
+
+    def __init__(self, capacity=65536, ring=False, timestamps=True):
+        """
+        :param int capacity: the number of emissions the columns hold before growing or wrapping.
+        :param bool ring: keep only the last `capacity` emissions.
+        :param bool timestamps: record the time of each emission, `False` records 0.
+        """
+        self.capacity = capacity
+        self.ring = ring
+        self.timestamps = timestamps
+        self._lock = Lock()
+        self._ids = {None: 0}
+        self._interned = [None]
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.name_ids = array('L', [0]) * self.capacity
+            self.function_ids = array('L', [0]) * self.capacity
+            self.tag_ids = array('L', [0]) * self.capacity
+            self.values = array('d', [0]) * self.capacity
+            self.times = array('d', [0]) * self.capacity
+            # the next row to write, and whether older rows were overwritten
+            self._next = 0
+            self._wrapped = False
+            # every emission since the last clear, including overwritten ones
+            self.recorded = 0
+            self.sketches = {}
+
+    def __len__(self):
+        return len(self.values) if self._wrapped else self._next
+
+    def intern(self, item):
+        """
+        Get the id of a name, function, tag set or set member, `None` is always 0.
+        """
+        try:
+            return self._ids[item]
+        except KeyError:
+            with self._lock:
+                if item not in self._ids:
+                    self._ids[item] = len(self._interned)
+                    self._interned.append(item)
+            return self._ids[item]
+
+    def record(self, function, name, value, tags=None):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = float(self.intern(value))
+
+        name_id, function_id, tag_id = self.intern(name), self.intern(function), self.intern(tags)
+        timestamp = time() if self.timestamps else 0
+
+        with self._lock:
+            row = self._next
+            if row == len(self.values):
+                if self.ring:
+                    row, self._wrapped = 0, True
+                else:
+                    self._grow()
+            self.name_ids[row] = name_id
+            self.function_ids[row] = function_id
+            self.tag_ids[row] = tag_id
+            self.values[row] = value
+            self.times[row] = timestamp
+            self._next = row + 1
+            self.recorded += 1
+
+    def _grow(self):
+        size = len(self.values)
+        for column in (self.name_ids, self.function_ids, self.tag_ids, self.values, self.times):
+            column.extend(array(column.typecode, [0]) * size)
+
+    def timing(self, name, value, sample_rate=1, tags=None):
+        self.record('timing', name, value, tags)
+
+    def update_stats(self, name, value, sample_rate=1, tags=None):
+        self.record('update_stats', name, value, tags)
+
+    def gauge(self, name, value, sample_rate=1, tags=None):
+        self.record('gauge', name, value, tags)
+
+    def send(self, name, value, sample_rate=1, tags=None):
+        self.record('send', name, value, tags)
+
+    def distribution(self, name, sketch, sample_rate=1, tags=None):
+        try:
+            self.sketches[name].merge(sketch)
+        except KeyError:
+            self.sketches[name] = DDSketch.from_bytes(sketch.to_bytes())
+        self.record('distribution', name, sketch.count, tags)
+
+    def timing_many(self, name, values, sample_rate=1, tags=None):
+        for value in values:
+            self.record('timing', name, value, tags)
+
+    def apply_many(self, metrics):
+        for metric in metrics:
+            getattr(self, metric.function)(metric.name, metric.value, metric.sample_rate, metric.tags)
+
+    def _rows(self):
+        # rows in the order they were recorded
+        if self._wrapped:
+            return chain(range(self._next, len(self.values)), range(self._next))
+        return range(self._next)
+
+    def _select(self, name=None, function=None):
+        name_id = None if name is None else self._ids.get(name, -1)
+        function_id = None if function is None else self._ids.get(function, -1)
+        name_ids, function_ids = self.name_ids, self.function_ids
+        return [
+            row for row in self._rows()
+            if (name_id is None or name_ids[row] == name_id) and (function_id is None or function_ids[row] == function_id)
+        ]
+
+    def emissions(self, name=None, function=None):
+        """
+        :returns: a list of `Emission`, optionally only those for a name and/or function.
+        """
+        interned = self._interned
+        return [
+            Emission(
+                interned[self.function_ids[row]],
+                interned[self.name_ids[row]],
+                self.values[row],
+                self.times[row],
+                interned[self.tag_ids[row]],
+            )
+            for row in self._select(name, function)
+        ]
+
+    def names(self):
+        """
+        :returns: the set of names recorded.
+        """
+        interned = self._interned
+        return set(interned[self.name_ids[row]] for row in self._rows())
+
+    def select_values(self, name, function=None):
+        """
+        :returns: an `array('d')` of the values recorded for a name.
+        """
+        values = self.values
+        return array('d', [values[row] for row in self._select(name, function)])
+
+    def count(self, name, function=None):
+        return len(self._select(name, function))
+
+    def total(self, name, function=None):
+        return sum(self.select_values(name, function))
+
+    def last(self, name, function=None):
+        rows = self._select(name, function)
+        return self.values[rows[-1]] if rows else None
+
+    def unique(self, name, function='send'):
+        """
+        The number of distinct values recorded, e.g. the members of a set.
+        """
+        return len(set(self.select_values(name, function)))
+
+    def summary(self, name, function=None):
+        """
+        :returns: the `(count, sum, minimum, maximum)` of the values recorded for a name.
+        """
+        return summarize(self.select_values(name, function))
+
+    def assert_recorded(self, name, function=None, count=None, total=None):
+        """
+        Raise an `AssertionError` unless a name was recorded, `count` times and
+        summing to `total` when they are given.
+        """
+        values = self.select_values(name, function)
+        description = name if function is None else '{0} ({1})'.format(name, function)
+
+        if not values:
+            raise AssertionError('{0} was not recorded, recorded: {1}'.format(description, sorted(self.names())))
+        if count is not None and len(values) != count:
+            raise AssertionError('{0} was recorded {1} times, not {2}'.format(description, len(values), count))
+        if total is not None and sum(values) != total:
+            raise AssertionError('{0} totals {1}, not {2}'.format(description, sum(values), total))
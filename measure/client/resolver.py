@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import socket
+from logging import getLogger
+from threading import (
+    Lock,
+    Thread,
+)
+from time import (
+    sleep,
+    time,
+)
+from weakref import WeakSet
+
+
+logger = getLogger(__name__)
+
+
+class CachedResolver(object):
+    """
+    Resolves a host once and caches the socket address.
+
+    The address is refreshed every `refresh_interval` seconds by a thread
+    shared by all resolvers, or on demand after a send error, so sending never
+    waits on DNS.
+
+        >>> resolver = CachedResolver('statsd.default.svc', 8125)
+        >>> sock.sendto(data, resolver.address)
+    """
+
+    def __init__(self, host, port, refresh_interval=60, family=socket.AF_INET, address=None):
+        """
+        :param str host: the host name to resolve.
+        :param int port: the port for the socket address.
+        :param float refresh_interval: seconds between re-resolves, `None` disables them.
+        :param int family: the address family the socket is using.
+        :param tuple address: an already resolved address to seed the cache with.
+        """
+        self.host = host
+        self.port = int(port)
+        self.family = family
+        self.refresh_interval = refresh_interval
+
+        self._refreshing = Lock()
+        self.next_refresh = None
+
+        self.address = address or self.resolve()
+
+        if refresh_interval:
+            self.next_refresh = time() + refresh_interval
+            _refresher.add(self)
+
+    def resolve(self):
+        """
+        Look up the socket address, this blocks on DNS.
+        """
+        info = socket.getaddrinfo(self.host, self.port, self.family, socket.SOCK_DGRAM)
+        return info[0][4]
+
+    def refresh(self):
+        """
+        Re-resolve the host, keeping the cached address if the lookup fails.
+        """
+        if not self._refreshing.acquire(False):
+            # another refresh is already in flight
+            return
+        self._refresh()
+
+    def refresh_async(self):
+        """
+        Re-resolve the host in the background, unless a refresh is already in flight.
+        """
+        if not self._refreshing.acquire(False):
+            return
+
+        try:
+            thread = Thread(target=self._refresh, name='measure-resolver-{0}'.format(self.host))
+            thread.daemon = True
+            thread.start()
+        except Exception:
+            self._refreshing.release()
+            raise
+
+    def _refresh(self):
+        # called holding `_refreshing`
+        try:
+            address = self.resolve()
+        except socket.error:
+            logger.warning('could not resolve %s, keeping %s', self.host, self.address, exc_info=True)
+        else:
+            if address != self.address:
+                logger.info('%s moved from %s to %s', self.host, self.address, address)
+                self.address = address
+        finally:
+            if self.refresh_interval:
+                self.next_refresh = time() + self.refresh_interval
+            self._refreshing.release()
+
+    def stop(self):
+        _refresher.discard(self)
+
+
+class Refresher(object):
+    """
+    One daemon thread refreshing every resolver that is due.
+
+    Resolvers are held weakly, so those of clients that are never closed do
+    not leak, and the thread exits when no resolver is left.
+    """
+
+    # seconds between checking which resolvers are due
+    tick = 1
+
+    def __init__(self):
+        self._resolvers = WeakSet()
+        self._lock = Lock()
+        self._thread = None
+
+    def add(self, resolver):
+        with self._lock:
+            self._resolvers.add(resolver)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='measure-resolver')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def discard(self, resolver):
+        with self._lock:
+            self._resolvers.discard(resolver)
+
+    def refresh_due(self):
+        """
+        Refresh the resolvers that are due.
+
+        :returns: `False` once there are no resolvers left.
+        """
+        with self._lock:
+            if not self._resolvers:
+                self._thread = None
+                return False
+            now = time()
+            due = [resolver for resolver in self._resolvers if resolver.next_refresh <= now]
+
+        for resolver in due:
+            try:
+                resolver.refresh()
+            except Exception:
+                logger.exception('could not refresh %s', resolver.host)
+        return True
+
+    def _run(self):
+        while self.refresh_due():
+            sleep(self.tick)
+
+
+_refresher = Refresher()
+
+
+class ResolvingSocket(object):
+    """
+    Wraps a UDP socket so that every send goes to the resolver's cached address.
+
+    A failed send triggers a background re-resolve and the error is re-raised.
+    """
+
+    def __init__(self, sock, resolver):
+        self.sock = sock
+        self.resolver = resolver
+
+    def __getattr__(self, item):
+        return getattr(self.sock, item)
+
+    def sendto(self, data, address=None):
+        try:
+            return self.sock.sendto(data, self.resolver.address)
+        except socket.error:
+            self.resolver.refresh_async()
+            raise
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from bisect import bisect
+from hashlib import md5
+from threading import Lock
+from time import time
+
+# External Libraries
+from measure.client.base import BaseClient
+from measure.client.pystatsd import PyStatsdClient
+from measure.names import StatsdNamePolicy
+
+
+def parse_endpoint(endpoint, default_port=8125):
+    """
+    Normalize an endpoint into a `(host, port)` tuple.
+
+        >>> parse_endpoint('statsd-1:8125')
+        ('statsd-1', 8125)
+        >>> parse_endpoint(('statsd-1', '8125'))
+        ('statsd-1', 8125)
+    """
+    if isinstance(endpoint, (tuple, list)):
+        host, port = endpoint
+    elif ':' in endpoint:
+        host, port = endpoint.rsplit(':', 1)
+    else:
+        host, port = endpoint, default_port
+    return host, int(port)
+
+
+class HashRing(object):
+    """
+    A consistent hash ring mapping keys onto nodes.
+
+    Each node is placed on the ring `replicas` times so that keys spread evenly,
+    adding or removing a node only remaps the keys that node owned.
+    """
+
+    def __init__(self, nodes=(), replicas=160):
+        self.replicas = replicas
+        # `(hashes, nodes)`, replaced as a whole so readers never need the lock
+        self._ring = ((), ())
+        self._lock = Lock()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(key):
+        return int(md5(key.encode('utf-8')).hexdigest()[:16], 16)
+
+    def add(self, node):
+        points = [(self.hash('{0}-{1}'.format(node, i)), node) for i in range(self.replicas)]
+        with self._lock:
+            self._swap(sorted(list(zip(*self._ring)) + points))
+
+    def remove(self, node):
+        with self._lock:
+            self._swap([(h, n) for h, n in zip(*self._ring) if n != node])
+
+    def _swap(self, ring):
+        self._ring = (tuple(h for h, _ in ring), tuple(n for _, n in ring))
+
+    def get(self, key):
+        hashes, nodes = self._ring
+        if not nodes:
+            raise LookupError('the hash ring has no nodes')
+        return nodes[bisect(hashes, self.hash(key)) % len(hashes)]
+
+    def __len__(self):
+        return len(set(self._ring[1]))
+
+
+class ShardedClient(BaseClient):
+    """
+    Client that spreads metrics across several statsd servers.
+
+    Every fully qualified metric name is always routed to the same endpoint, so
+    per-metric aggregation stays correct on the servers.
+
+        >>> client = ShardedClient(['statsd-1:8125', 'statsd-2:8125'])
+    """
+
+    # routes are cached per name, the cache is reset once it grows past this size
+    max_cached_routes = 10000
+
+    name_policy = StatsdNamePolicy()
+
+    def __init__(self, endpoints, client_class=PyStatsdClient, replicas=160, **client_kwargs):
+        """
+        :param list endpoints: `host:port` strings or `(host, port)` tuples.
+        :param type client_class: the client used to talk to each endpoint.
+        :param int replicas: the number of points each endpoint has on the hash ring.
+        :param client_kwargs: extra arguments passed to each endpoint's client.
+        """
+        self.client_class = client_class
+        self.client_kwargs = client_kwargs
+        self.clients = {}
+        self.ring = HashRing(replicas=replicas)
+        self._routes = {}
+        self._lock = Lock()
+
+        for endpoint in endpoints:
+            self.add_endpoint(endpoint)
+
+    def add_endpoint(self, endpoint):
+        host, port = parse_endpoint(endpoint)
+        key = '{0}:{1}'.format(host, port)
+        with self._lock:
+            if key not in self.clients:
+                self.clients[key] = self.client_class(host=host, port=port, **self.client_kwargs)
+                self.ring.add(key)
+                self._routes = {}
+
+    def remove_endpoint(self, endpoint):
+        key = '{0}:{1}'.format(*parse_endpoint(endpoint))
+        with self._lock:
+            if key in self.clients:
+                # off the ring first, so routing never picks a removed client
+                self.ring.remove(key)
+                self._routes = {}
+                self.clients.pop(key)
+
+    def route(self, name):
+        """
+        Get the client responsible for a fully qualified metric name.
+        """
+        routes = self._routes
+        try:
+            return routes[name]
+        except KeyError:
+            pass
+
+        client = self.clients.get(self.ring.get(name))
+        if client is None:
+            # the endpoint was removed between reading the ring and the clients
+            client = self.clients[self.ring.get(name)]
+        if len(routes) >= self.max_cached_routes:
+            routes.clear()
+        routes[name] = client
+        return client
+
+    def timing(self, name, *args, **kwargs):
+        self.route(name).timing(name, *args, **kwargs)
+
+    def update_stats(self, name, *args, **kwargs):
+        self.route(name).update_stats(name, *args, **kwargs)
+
+    def gauge(self, name, *args, **kwargs):
+        self.route(name).gauge(name, *args, **kwargs)
+
+    def send(self, name, *args, **kwargs):
+        self.route(name).send(name, *args, **kwargs)
+
+    def timing_many(self, name, *args, **kwargs):
+        self.route(name).timing_many(name, *args, **kwargs)
+
+    def distribution(self, name, *args, **kwargs):
+        self.route(name).distribution(name, *args, **kwargs)
+
+    def apply_many(self, metrics):
+        shards = {}
+        for metric in metrics:
+            client = self.route(metric.name)
+            shards.setdefault(id(client), (client, []))[1].append(metric)
+
+        for client, shard in shards.values():
+            client.apply_many(shard)
+
+    def flush(self, timeout=None):
+        return self._each('flush', timeout)
+
+    def close(self, timeout=None):
+        return self._each('close', timeout)
+
+    def _each(self, method, timeout):
+        deadline = None if timeout is None else time() + timeout
+        pending = 0
+        for client in list(self.clients.values()):
+            pending += getattr(client, method)(None if deadline is None else max(0, deadline - time()))
+        return pending
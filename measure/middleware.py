@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from time import time
+
+# External Libraries
+from measure.stats.batch import Batch
+from measure.stats.stat import DjangoStats
+from measure.stats.timer import TimerDict
+
+
+class StatsMiddleware(object):
+    """
+    Django middleware that times every request by view and status code.
+
+    Every stat applied while handling the request is batched and sent together
+    once the response has been sent, so stats never add to response latency.
+
+        MIDDLEWARE = [
+            'measure.middleware.StatsMiddleware',
+            ...
+        ]
+
+    Besides the settings read by `DjangoStats` it uses
+
+        STATS_MIDDLEWARE_PREFIX the prefix for the request stats, defaults to `django`
+    """
+
+    def __init__(self, get_response=None):
+        from django.conf import settings
+
+        self.get_response = get_response
+        self.stats = DjangoStats(
+            getattr(settings, 'STATS_MIDDLEWARE_PREFIX', 'django'),
+            TimerDict(
+                'response',
+                'time taken to build a response, by view and status code',
+                key_format='{name}.{key[0]}.{key[1]}',
+            ),
+        )
+
+    def __call__(self, request):
+        batch = Batch()
+        previous = batch.activate()
+        start = time()
+
+        try:
+            response = self.get_response(request)
+            self.stats.response[self.view_name(request), response.status_code].time(time() - start)
+        except Exception:
+            batch.flush()
+            raise
+        finally:
+            batch.deactivate(previous)
+
+        # the server closes the response once it has been sent to the client
+        close = response.close
+
+        def close_and_flush():
+            try:
+                close()
+            finally:
+                batch.flush()
+
+        response.close = close_and_flush
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name or 'unnamed'
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Name policies keep metric names valid for a backend.
+
+A `Stats` uses the policy of its client's class (`BaseClient.name_policy`) to
+sanitize the fully qualified name of each stat once, when the stat is
+created, so sending never pays for it. Strict stats raise a `ValueError` for
+invalid names instead.
+
+    >>> StatsdNamePolicy().sanitize('api.GET /users|200')
+    'api.GET_users_200'
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import re
+
+
+class NamePolicy(object):
+    """
+    Replaces runs of `invalid` characters with `replacement` and truncates to
+    `max_length`. Results are memoized, the memo is reset once it holds
+    `max_cached` names.
+    """
+
+    invalid = None
+    replacement = '_'
+    max_length = None
+    max_cached = 10000
+
+    def __init__(self):
+        self._memo = {}
+
+    def sanitize(self, name):
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+
+        if len(self._memo) >= self.max_cached:
+            self._memo.clear()
+        clean = self._memo[name] = self.clean(name)
+        return clean
+
+    def clean(self, name):
+        """
+        The rules of the policy, override this for rules that are not a pattern.
+        """
+        if self.invalid is not None:
+            name = self.invalid.sub(self.replacement, name)
+        if self.max_length is not None:
+            name = name[:self.max_length]
+        return name
+
+    def validate(self, name):
+        """
+        :raises ValueError: if the name is not valid.
+        """
+        clean = self.sanitize(name)
+        if clean != name:
+            raise ValueError('invalid metric name {0!r}, try {1!r}'.format(name, clean))
+        return name
+
+
+class StatsdNamePolicy(NamePolicy):
+    """
+    Letters, digits, `_`, `-` and `.`, anything else could break the line
+    format (`:`, `|`, `@`, `#`, whitespace) or the graphite hierarchy (`/`).
+    """
+
+    invalid = re.compile(r'[^\w.\-]+', re.UNICODE)
+
+
+class CloudWatchNamePolicy(NamePolicy):
+    """
+    Names are split on their last `.` into a namespace and a metric name,
+    each at most 255 characters. Namespaces may only have letters, digits and
+    `.-_/#: `, metric names may have any printable ASCII.
+    """
+
+    invalid = re.compile(r'[^A-Za-z0-9.\-_/#: ]+')
+    invalid_metric = re.compile(r'[^\x20-\x7e]+')
+    max_length = 255
+
+    def clean(self, name):
+        namespace, dot, metric = name.rpartition('.')
+        namespace = self.invalid.sub(self.replacement, namespace)[:self.max_length]
+        metric = self.invalid_metric.sub(self.replacement, metric).strip()[:self.max_length] or self.replacement
+        return namespace + dot + metric
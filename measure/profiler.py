@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+A low frequency sampling profiler that reports through `Stats`.
+
+Every `interval` seconds the profiler looks at what each thread is running
+and, every `report_interval` seconds, sends per function (or per module):
+
+- `<prefix>.profile.samples.<key>` a `CounterDict` of the samples taken.
+- `<prefix>.profile.time.<key>` a `TimerDict` of the estimated seconds spent.
+
+    >>> profiler = SamplingProfiler(stats, interval=0.05).start()
+
+Only the function a thread is currently running is counted (self time).
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import re
+import signal
+import sys
+from logging import getLogger
+from threading import (
+    Event,
+    Lock,
+    Thread,
+    _MainThread,
+    current_thread,
+)
+from time import time
+
+# External Libraries
+from measure.stats import (
+    CounterDict,
+    TimerDict,
+)
+
+
+logger = getLogger(__name__)
+
+_invalid = re.compile(r'[^A-Za-z0-9_]+')
+
+
+class SamplingProfiler(object):
+    """
+    Samples stacks from a daemon thread with `sys._current_frames`, or with
+    `mode='signal'` from a `SIGPROF` interval timer, which only samples the
+    main thread while it uses CPU. Signal handlers can only be installed from
+    the main thread, so in `signal` mode `start` and `stop` must be called
+    from it.
+
+    Sampling never takes more than `max_overhead` of the time: the interval is
+    stretched when taking a sample is slow, and the time estimates use the
+    actual time between samples.
+    """
+
+    # keys of the code objects seen, reset once it grows past this size
+    max_cached_keys = 10000
+
+    def __init__(
+        self,
+        stats,
+        interval=0.1,
+        report_interval=60,
+        by='function',
+        mode='thread',
+        max_keys=500,
+        max_overhead=0.01,
+        ignore_modules=('threading',),
+    ):
+        """
+        :param Stats stats: the stats to report through, under its `profile` child.
+        :param float interval: seconds between samples.
+        :param float report_interval: seconds between reports.
+        :param str by: `function` or `module`.
+        :param str mode: `thread` or `signal`.
+        :param int max_keys: keys past this many in a report are counted as `other`.
+        :param float max_overhead: the largest fraction of time spent sampling.
+        :param tuple ignore_modules: leaf frames in these modules are not counted, e.g. idle threads.
+        """
+        if by not in ('function', 'module'):
+            raise ValueError('by must be function or module, not {0!r}'.format(by))
+        if mode not in ('thread', 'signal'):
+            raise ValueError('mode must be thread or signal, not {0!r}'.format(mode))
+
+        self.stats = stats.child(
+            'profile',
+            CounterDict('samples', 'samples taken in each function or module'),
+            TimerDict('time', 'estimated seconds spent in each function or module'),
+        )
+        self.interval = interval
+        self.report_interval = report_interval
+        self.by = by
+        self.mode = mode
+        self.max_keys = max_keys
+        self.max_overhead = max_overhead
+        self.ignore_modules = frozenset(ignore_modules)
+
+        # the interval currently used, it grows when sampling is slow
+        self.effective_interval = interval
+        self._keys = {}
+        self._samples = {}
+        self._seconds = {}
+        # guards the samples, which the reporting thread swaps out
+        self._lock = Lock()
+        # samples skipped because a report was being taken
+        self.skipped = 0
+        self._last_sample = None
+        self._stopped = Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.mode == 'signal' and not isinstance(current_thread(), _MainThread):
+            raise RuntimeError('a signal mode profiler must be started from the main thread')
+
+        self._stopped.clear()
+        self._last_sample = time()
+        if self.mode == 'signal':
+            signal.signal(signal.SIGPROF, self._handle_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+        self._thread = Thread(target=self._run, name='measure-profiler')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop sampling and report what was sampled since the last report.
+        """
+        if self.mode == 'signal':
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+        self._stopped.set()
+        if self._thread is not None and self._thread is not current_thread():
+            self._thread.join()
+        self._thread = None
+        self.report()
+
+    def key(self, frame):
+        code = frame.f_code
+        try:
+            return self._keys[code]
+        except KeyError:
+            pass
+
+        module = frame.f_globals.get('__name__') or 'unknown'
+        if module in self.ignore_modules:
+            key = None
+        elif self.by == 'module':
+            key = _invalid.sub('_', module)
+        else:
+            key = _invalid.sub('_', module) + '-' + _invalid.sub('_', code.co_name)
+
+        if len(self._keys) >= self.max_cached_keys:
+            self._keys.clear()
+        self._keys[code] = key
+        return key
+
+    def sample(self, frames, blocking=True):
+        """
+        Count the functions the given frames are running.
+
+        :param frames: the leaf frame of each thread to sample.
+        :param bool blocking: wait for a report being taken, or skip the sample.
+        """
+        if not self._lock.acquire(blocking):
+            self.skipped += 1
+            return
+
+        try:
+            now = time()
+            elapsed, self._last_sample = now - (self._last_sample or now), now
+
+            samples, seconds = self._samples, self._seconds
+            for frame in frames:
+                key = self.key(frame)
+                if key is None:
+                    continue
+                if key not in samples and len(samples) >= self.max_keys:
+                    key = 'other'
+                samples[key] = samples.get(key, 0) + 1
+                seconds[key] = seconds.get(key, 0) + elapsed
+        finally:
+            self._lock.release()
+
+    def report(self):
+        """
+        Send the samples taken since the last report.
+
+        :returns: the number of keys reported.
+        """
+        with self._lock:
+            samples, self._samples = self._samples, {}
+            seconds, self._seconds = self._seconds, {}
+
+        with self.stats.batch():
+            for key, count in samples.items():
+                self.stats.samples[key].increment(count)
+                self.stats.time[key].time(seconds[key])
+        return len(samples)
+
+    def _handle_signal(self, signum, frame):
+        start = time()
+        # never wait in a signal handler, the interrupted thread may be the one reporting
+        self.sample([frame], blocking=False)
+        self._adjust(time() - start)
+
+    def _adjust(self, cost):
+        interval = max(self.interval, cost / self.max_overhead)
+        if interval != self.effective_interval:
+            self.effective_interval = interval
+            if self.mode == 'signal':
+                signal.setitimer(signal.ITIMER_PROF, interval, interval)
+
+    def _run(self):
+        own = current_thread().ident
+        next_report = time() + self.report_interval
+        wait = self.effective_interval if self.mode == 'thread' else self.report_interval
+
+        while not self._stopped.wait(wait):
+            try:
+                if self.mode == 'thread':
+                    start = time()
+                    self.sample(frame for ident, frame in sys._current_frames().items() if ident != own)
+                    self._adjust(time() - start)
+                    wait = self.effective_interval
+
+                if time() >= next_report:
+                    next_report += self.report_interval
+                    self.report()
+            except Exception:
+                logger.exception('profiler failed')
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Declare stats in one schema and compile it into a frozen `Stats`.
+
+    >>> stats = compile_schema({
+    >>>     'prefix': 'app',
+    >>>     'stats': [
+    >>>         {'type': 'counter', 'name': 'requests', 'doc': 'requests served', 'aggregate': True},
+    >>>         {'type': 'timer_dict', 'name': 'latency', 'doc': 'latency by route', 'max_keys': 50},
+    >>>     ],
+    >>>     'children': {
+    >>>         'db': {'stats': [{'type': 'timer', 'name': 'query', 'doc': 'query latency'}]},
+    >>>     },
+    >>> }, client=client)
+
+Schemas can also be loaded from JSON, YAML (needs PyYAML) or TOML (needs
+Python 3.11 or `tomli`) files with `load_schema`. Every error is raised as a
+`SchemaError` when the schema is compiled, not when a stat is first used.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import json
+
+# External Libraries
+from measure.stats import (
+    Counter,
+    CounterDict,
+    Distribution,
+    DistributionDict,
+    Gauge,
+    GaugeDict,
+    Histogram,
+    HistogramDict,
+    Meter,
+    MeterDict,
+    StatDict,
+    Stats,
+    Timer,
+    TimerDict,
+)
+from measure.stats.batch import current_batch
+from measure.stats.set import (
+    Set,
+    SetDict,
+)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+stat_types = {
+    'counter': Counter,
+    'counter_dict': CounterDict,
+    'distribution': Distribution,
+    'distribution_dict': DistributionDict,
+    'gauge': Gauge,
+    'gauge_dict': GaugeDict,
+    'histogram': Histogram,
+    'histogram_dict': HistogramDict,
+    'meter': Meter,
+    'meter_dict': MeterDict,
+    'set': Set,
+    'set_dict': SetDict,
+    'timer': Timer,
+    'timer_dict': TimerDict,
+}
+
+# options every stat takes, and the extra options of some types
+_options = frozenset(['type', 'name', 'doc', 'sample_rate', 'aggregate', 'tags'])
+_dict_options = frozenset(['max_keys', 'keys', 'key_format', 'tag_name'])
+_type_options = {
+    Histogram: frozenset(['buckets']),
+    HistogramDict: frozenset(['buckets']),
+    Distribution: frozenset(['relative_accuracy', 'max_bins']),
+    DistributionDict: frozenset(['relative_accuracy', 'max_bins']),
+}
+
+_namespace_options = frozenset(['prefix', 'tags', 'stats', 'children'])
+
+
+class FrozenStats(Stats):
+    """
+    `Stats` compiled from a schema: stats can not be added, missing stats
+    raise an `AttributeError` and client functions are looked up once.
+    """
+
+    strict = True
+    validate_names = True
+
+    def __init__(self, prefix, *stats, **kwargs):
+        self._frozen = False
+        super(FrozenStats, self).__init__(prefix, *stats, **kwargs)
+        self._functions = {}
+
+    def freeze(self):
+        client = self.client
+        for function in set(stat._function for stat in self.stats) | set(['timing_many']):
+            self._functions[function] = getattr(client, function, None)
+        for child in self.children.values():
+            child.freeze()
+        self._frozen = True
+
+    def add_stat(self, stat):
+        if self._frozen:
+            raise TypeError('stats compiled from a schema can not be changed')
+        super(FrozenStats, self).add_stat(stat)
+
+    def child(self, suffix, *stats, **kwargs):
+        if self._frozen:
+            if stats or suffix not in self.children:
+                raise TypeError('stats compiled from a schema can not be changed')
+            return self.children[suffix]
+        return super(FrozenStats, self).child(suffix, *stats, **kwargs)
+
+    def apply(self, stat, value, function=None):
+        function = function or stat._function
+        func = self._functions.get(function)
+
+        if func is None or current_batch() is not None:
+            super(FrozenStats, self).apply(stat, value, function)
+        elif stat.tags is None:
+            func(stat.full_name, value, sample_rate=stat.sample_rate)
+        else:
+            func(stat.full_name, value, sample_rate=stat.sample_rate, tags=stat.tags)
+
+    def cardinality(self):
+        """
+        The most series each stat can send, `None` for stat dicts without `max_keys`.
+
+        :returns: a dict of full names to series counts.
+        """
+        series = {}
+        for stat in self.stats:
+            if isinstance(stat, (Histogram, HistogramDict)):
+                per_stat = len(stat.buckets or Histogram.default_buckets) + 2
+            else:
+                per_stat = 1
+            if hasattr(stat, 'max_keys'):
+                per_stat = None if stat.max_keys is None else per_stat * (stat.max_keys + 1)
+            series[stat.full_name] = per_stat
+
+        for child in self.children.values():
+            series.update(child.cardinality())
+        return series
+
+
+def compile_schema(schema, client, **kwargs):
+    """
+    Build a frozen `Stats` from a schema.
+
+    :param dict schema: with `prefix`, `stats` (a list of stat definitions, or a
+        dict of them by name), and optionally `tags` and `children`, a dict of
+        nested schemas by suffix.
+    :param BaseClient client: the client the stats send through.
+    :param kwargs: passed to `Stats`, e.g. `flush_interval`.
+    :raises SchemaError: if the schema is not valid.
+    """
+    if not isinstance(schema, dict):
+        raise SchemaError('a schema must be a dict, not {0}'.format(type(schema).__name__))
+
+    _check_options(schema, _namespace_options, 'schema')
+    prefix = schema.get('prefix')
+    if not prefix:
+        raise SchemaError('the schema needs a prefix')
+
+    try:
+        stats = FrozenStats(prefix, client=client, tags=schema.get('tags'), **kwargs)
+    except TypeError as error:
+        raise SchemaError(str(error))
+
+    _populate(stats, schema)
+    stats.freeze()
+    return stats
+
+
+def _populate(stats, schema):
+    for stat, keys in _build_stats(stats.prefix, schema.get('stats') or []):
+        # stats are attributes, they can not replace those of the namespace
+        if hasattr(type(stats), stat.name) or stat.name in vars(stats):
+            raise SchemaError('{0}.{1}: the name is reserved, it is an attribute of {2}'.format(
+                stats.prefix, stat.name, type(stats).__name__))
+        try:
+            stats.add_stat(stat)
+            # preallocate the declared keys of stat dicts
+            for key in keys:
+                stat[key]
+        except ValueError as error:
+            raise SchemaError(str(error))
+
+    children = schema.get('children') or {}
+    if not isinstance(children, dict):
+        raise SchemaError('{0}: children must be a dict of schemas by suffix'.format(stats.prefix))
+
+    for suffix, child_schema in sorted(children.items()):
+        if not isinstance(child_schema, dict):
+            raise SchemaError('{0}.{1}: a schema must be a dict'.format(stats.prefix, suffix))
+        _check_options(child_schema, _namespace_options - set(['prefix']), '{0}.{1}'.format(stats.prefix, suffix))
+        if any(stat.name == suffix for stat in stats.stats):
+            raise SchemaError('{0}.{1}: a child has the name of a stat'.format(stats.prefix, suffix))
+        _populate(stats.child(suffix, tags=child_schema.get('tags')), child_schema)
+
+
+def _build_stats(prefix, definitions):
+    if isinstance(definitions, dict):
+        definitions = [dict(definition, name=name) for name, definition in sorted(definitions.items())]
+
+    names = set()
+    stats = []
+    for definition in definitions:
+        stat, keys = _build_stat(prefix, definition)
+        if stat.name in names:
+            raise SchemaError('{0}.{1}: declared twice'.format(prefix, stat.name))
+        names.add(stat.name)
+        stats.append((stat, keys))
+    return stats
+
+
+def _build_stat(prefix, definition):
+    if not isinstance(definition, dict):
+        raise SchemaError('{0}: a stat must be a dict, not {1!r}'.format(prefix, definition))
+
+    where = '{0}.{1}'.format(prefix, definition.get('name', '?'))
+    try:
+        stat_class = stat_types[definition.get('type')]
+    except KeyError:
+        raise SchemaError('{0}: unknown type {1!r}, use one of {2}'.format(
+            where, definition.get('type'), ', '.join(sorted(stat_types))))
+
+    allowed = _options | _type_options.get(stat_class, frozenset())
+    if issubclass(stat_class, StatDict):
+        allowed |= _dict_options
+    _check_options(definition, allowed, where)
+    _check_values(definition, where)
+
+    kwargs = dict((key, value) for key, value in definition.items() if key not in ('type', 'name', 'doc', 'keys'))
+    try:
+        stat = stat_class(definition['name'], definition['doc'], **kwargs)
+    except (TypeError, ValueError) as error:
+        raise SchemaError('{0}: {1}'.format(where, error))
+
+    return stat, definition.get('keys') or ()
+
+
+def _check_values(definition, where):
+    for required in ('name', 'doc'):
+        if not definition.get(required):
+            raise SchemaError('{0}: {1} is required'.format(where, required))
+
+    sample_rate = definition.get('sample_rate', 1)
+    if not _is_number(sample_rate) or not 0 < sample_rate <= 1:
+        raise SchemaError('{0}: sample_rate must be in (0, 1], not {1!r}'.format(where, sample_rate))
+
+    # stat dicts only build their distributions when a key is first used
+    relative_accuracy = definition.get('relative_accuracy', 0.01)
+    if not _is_number(relative_accuracy) or not 0 < relative_accuracy < 1:
+        raise SchemaError('{0}: relative_accuracy must be in (0, 1), not {1!r}'.format(where, relative_accuracy))
+
+    for option in ('max_keys', 'max_bins'):
+        value = definition.get(option)
+        if value is not None and (not _is_number(value, int) or value < 1):
+            raise SchemaError('{0}: {1} must be a positive integer, not {2!r}'.format(where, option, value))
+
+    max_keys = definition.get('max_keys')
+    keys = definition.get('keys') or ()
+    if max_keys is not None and len(keys) > max_keys:
+        raise SchemaError('{0}: declares {1} keys but max_keys is {2}'.format(where, len(keys), max_keys))
+
+
+def _is_number(value, types=(int, float)):
+    # bool is an int, but True is not a sample rate
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def _check_options(definition, allowed, where):
+    unknown = set(definition) - allowed
+    if unknown:
+        raise SchemaError('{0}: unknown options {1}'.format(where, ', '.join(sorted(unknown))))
+
+
+def load_schema(path):
+    """
+    Read a schema from a `.json`, `.yaml`/`.yml` or `.toml` file.
+
+    :raises SchemaError: if the file can not be parsed.
+    :raises ImportError: if the parser for the format is not installed.
+    """
+    with open(path, 'rb') as schema_file:
+        data = schema_file.read()
+
+    try:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(data)
+
+        if path.endswith('.toml'):
+            try:
+                import tomllib
+            except ImportError:
+                import tomli as tomllib
+            return tomllib.loads(data.decode('utf-8'))
+
+        return json.loads(data.decode('utf-8'))
+    except ImportError:
+        raise
+    except Exception as error:
+        raise SchemaError('could not parse {0}: {1}'.format(path, error))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Drain buffered metrics when the process exits.
+
+Every `Stats` registers itself here, and at exit each one is closed, then each
+of their clients, all within `timeout` seconds. Sending happens in daemon
+threads that are abandoned at the deadline, so exiting never hangs on a slow
+or unreachable backend. The number of metrics that could not be sent in time
+is logged.
+
+SIGTERM does not run `atexit` handlers, call `install_signal_handlers()` to
+drain on signals as well.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import atexit
+import os
+import signal
+from logging import getLogger
+from threading import Thread
+from time import time
+from weakref import WeakSet
+
+
+logger = getLogger(__name__)
+
+# seconds the exit drain may take
+timeout = 5
+
+_registry = WeakSet()
+
+
+def register(stats):
+    """
+    Drain a `Stats` at exit.
+    """
+    _registry.add(stats)
+
+
+def unregister(stats):
+    _registry.discard(stats)
+
+
+def call_with_timeout(func, timeout, *args):
+    """
+    Call a function in a daemon thread and wait at most `timeout` seconds for it.
+
+    :returns: `(finished, result)`, result is `None` if the call did not finish or failed.
+    """
+    result = []
+
+    def target():
+        try:
+            result.append(func(*args))
+        except Exception:
+            logger.exception('%s failed', getattr(func, '__name__', func))
+            result.append(None)
+
+    thread = Thread(target=target, name='measure-drain')
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    return bool(result), result[0] if result else None
+
+
+def drain(timeout=None):
+    """
+    Close every registered `Stats` and their clients within `timeout` seconds.
+
+    :param float timeout: seconds to wait at most, defaults to `measure.shutdown.timeout`.
+    :returns: the number of metrics dropped.
+    """
+    timeout = globals()['timeout'] if timeout is None else timeout
+    deadline = time() + timeout
+
+    dropped = 0
+    clients = []
+    for stats in list(_registry):
+        try:
+            dropped += stats.close(max(0, deadline - time()))
+        except Exception:
+            logger.exception('could not close %s', stats.prefix)
+        if all(client is not stats.client for client in clients):
+            clients.append(stats.client)
+
+    for client in clients:
+        finished, pending = call_with_timeout(client.close, max(0, deadline - time()), max(0, deadline - time()))
+        if not finished:
+            logger.warning('%r did not close before the deadline', client)
+        dropped += pending or 0
+
+    # metrics still in open batches, e.g. of a request that was interrupted
+    from measure.stats.batch import unsent_metrics
+    unsent = unsent_metrics()
+    if unsent:
+        logger.warning('%d metrics in open batches were not sent', unsent)
+        dropped += unsent
+
+    if dropped:
+        logger.warning('dropped %d metrics at shutdown', dropped)
+    return dropped
+
+
+def install_signal_handlers(signals=(signal.SIGTERM,), timeout=None):
+    """
+    Drain before the process is terminated by a signal. Previously installed
+    handlers still run afterwards, and signals that would have killed the
+    process still do.
+
+    The drain runs in a daemon thread, the handler waits for it at most
+    `timeout` seconds (plus a second), so a signal arriving while the
+    interrupted thread holds a lock the drain needs can not deadlock.
+
+    Must be called from the main thread.
+    """
+    for signum in signals:
+        previous = signal.getsignal(signum)
+        signal.signal(signum, _make_handler(previous, timeout))
+
+
+def _make_handler(previous, timeout):
+
+    def handler(signum, frame):
+        wait = globals()['timeout'] if timeout is None else timeout
+        finished, _ = call_with_timeout(drain, wait + 1, timeout)
+        if not finished:
+            logger.warning('the drain did not finish before the deadline')
+
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            # restore the default action and deliver the signal again
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    return handler
+
+
+atexit.register(drain)
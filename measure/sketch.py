@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+A DDSketch: a quantile sketch with relative error guarantees that can be
+merged across processes and hosts.
+
+Values are counted in logarithmic buckets, so any quantile is within
+`relative_accuracy` of the true value, and merging two sketches is adding
+their bucket counts. The number of buckets is bounded by `max_bins`, past it
+the lowest buckets are collapsed together, which only loses accuracy for the
+lowest quantiles.
+
+    >>> sketch = DDSketch()
+    >>> for value in latencies:
+    >>>     sketch.add(value)
+    >>> sketch.quantile(0.99)
+
+`to_string` and `from_string` encode a sketch in a compact base64 form, a few
+bytes per bucket.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import base64
+import math
+import struct
+
+
+_header = struct.Struct('<Bd')
+_stats = struct.Struct('<ddd')
+
+_version = 1
+
+_inf = float('inf')
+
+
+class Store(object):
+    """
+    The counts of one sign's buckets, at most `max_bins` of them.
+    """
+
+    __slots__ = ('bins', 'max_bins', 'floor')
+
+    def __init__(self, max_bins):
+        self.bins = {}
+        self.max_bins = max_bins
+        # indexes below the floor were collapsed into it
+        self.floor = None
+
+    def add(self, index, count):
+        if self.floor is not None and index < self.floor:
+            index = self.floor
+
+        bins = self.bins
+        if index in bins:
+            bins[index] += count
+            return
+
+        bins[index] = count
+        if len(bins) > self.max_bins:
+            self.collapse()
+
+    def collapse(self):
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        floor = indexes[excess]
+        for index in indexes[:excess]:
+            self.bins[floor] += self.bins.pop(index)
+        self.floor = floor
+
+    def merge(self, other):
+        for index, count in other.bins.items():
+            self.add(index, count)
+
+
+def _write_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, position):
+    n = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, position
+        shift += 7
+
+
+class DDSketch(object):
+
+    __slots__ = ('relative_accuracy', 'max_bins', 'gamma', '_log_gamma', 'positive', 'negative',
+                 'zero_count', 'count', 'sum', 'min', 'max')
+
+    # values closer to zero than this are counted as zero
+    min_indexable = 1e-9
+
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        """
+        :param float relative_accuracy: the largest relative error of a quantile.
+        :param int max_bins: the most buckets kept for each sign.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be between 0 and 1')
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = Store(max_bins)
+        self.negative = Store(max_bins)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return 'DDSketch(count={0}, bins={1})'.format(self.count, len(self.positive.bins) + len(self.negative.bins))
+
+    def index(self, value):
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def value(self, index):
+        """
+        The value a bucket stands for, within `relative_accuracy` of every value in it.
+        """
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        """
+        Count a value, NaN and infinite values have no bucket and are skipped.
+        """
+        if not -_inf < value < _inf:
+            return
+
+        if value > self.min_indexable:
+            self.positive.add(self.index(value), count)
+        elif value < -self.min_indexable:
+            self.negative.add(self.index(-value), count)
+        else:
+            self.zero_count += count
+
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch with the same `relative_accuracy`.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError('only sketches with the same relative accuracy can be merged')
+        if not other.count:
+            return
+
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """
+        :param float q: between 0 and 1, e.g. 0.99 for the 99th percentile.
+        :returns: the estimated value, or `None` if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError('quantile must be between 0 and 1')
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self.bins():
+            seen += count
+            if seen > rank:
+                return max(self.min, min(self.max, value))
+        return self.max
+
+    def bins(self):
+        """
+        :returns: the `(value, count)` of every bucket in ascending order of value.
+        """
+        bins = [(-self.value(index), self.negative.bins[index]) for index in sorted(self.negative.bins, reverse=True)]
+        if self.zero_count:
+            bins.append((0.0, self.zero_count))
+        bins.extend((self.value(index), self.positive.bins[index]) for index in sorted(self.positive.bins))
+        return bins
+
+    def to_bytes(self):
+        out = bytearray(_header.pack(_version, self.relative_accuracy))
+        out.extend(_stats.pack(self.sum, self.min, self.max))
+        _write_varint(out, self.zero_count)
+
+        for store in (self.positive, self.negative):
+            _write_varint(out, len(store.bins))
+            previous = 0
+            for index in sorted(store.bins):
+                delta = index - previous
+                # zigzag, the first index may be negative
+                _write_varint(out, delta * 2 if delta >= 0 else -delta * 2 - 1)
+                _write_varint(out, store.bins[index])
+                previous = index
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data, max_bins=2048):
+        data = bytearray(data)
+        version, relative_accuracy = _header.unpack_from(bytes(data[:_header.size]))
+        if version != _version:
+            raise ValueError('unknown sketch version {0}'.format(version))
+
+        sketch = cls(relative_accuracy, max_bins)
+        position = _header.size
+        sketch.sum, sketch.min, sketch.max = _stats.unpack_from(bytes(data[position:position + _stats.size]))
+        position += _stats.size
+        sketch.zero_count, position = _read_varint(data, position)
+
+        count = sketch.zero_count
+        for store in (sketch.positive, sketch.negative):
+            size, position = _read_varint(data, position)
+            index = 0
+            for _ in range(size):
+                delta, position = _read_varint(data, position)
+                index += delta // 2 if not delta & 1 else -(delta + 1) // 2
+                bin_count, position = _read_varint(data, position)
+                store.add(index, bin_count)
+                count += bin_count
+        sketch.count = count
+        return sketch
+
+    def to_string(self):
+        """
+        The sketch as a base64 string, safe to put in a statsd line.
+        """
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    @classmethod
+    def from_string(cls, string, max_bins=2048):
+        return cls.from_bytes(base64.b64decode(string), max_bins)
@@ -4,15 +4,24 @@ from __future__ import absolute_import
 
 # Standard Library
 import logging
+from time import time
 
 from .counter import (
     Counter,
     CounterDict,
 )
+from .distribution import (
+    Distribution,
+    DistributionDict,
+)
 from .gauge import (
     Gauge,
     GaugeDict,
 )
+from .histogram import (
+    Histogram,
+    HistogramDict,
+)
 from .meter import (
     Meter,
     MeterDict,
@@ -29,12 +38,46 @@ from .timer import (
 
 logger = logging.getLogger(__name__)
 
+# name -> (last time an error was logged, calls since)
+_reported = {}
+# the most names tracked in `_reported`, it is reset once it grows past this size
+max_reported = 1000
+
 
 class FakeStat(Timer, Meter, Counter, Gauge, TimerDict, CounterDict, GaugeDict):
+    """
+    Stands in for stats that do not exist, it does nothing but log an error.
+
+    `Stats` hands out one shared instance per missing name, and the error for a
+    name is logged at most once every `log_interval` seconds. Keys of a
+    `FakeStat` are `FakeStat`s too, made on each lookup and never kept, so
+    nothing is ever sent or held on to for them.
+    """
     # Meter must precede Counter for the MRO to resolve
 
+    __slots__ = ()
+
+    log_interval = 60
+
     def apply(self, *args, **kwargs):
-        logger.error('stat <%s> does not exist', self.name)
+        name = self.full_name
+        now = time()
+
+        logged, suppressed = _reported.get(name, (None, 0))
+        if logged is not None and now - logged < self.log_interval:
+            _reported[name] = (logged, suppressed + 1)
+            return
+
+        if name not in _reported and len(_reported) >= max_reported:
+            _reported.clear()
+        _reported[name] = (now, 0)
+        if suppressed:
+            logger.error('stat <%s> does not exist (%d more times since last logged)', name, suppressed)
+        else:
+            logger.error('stat <%s> does not exist', name)
+
+    def __setitem__(self, key, stat):
+        pass
 
     def decrement(self, *args, **kwargs):
         """
@@ -42,5 +85,19 @@ class FakeStat(Timer, Meter, Counter, Gauge, TimerDict, CounterDict, GaugeDict):
         """
         self.apply(*args, **kwargs)
 
+    def observe(self, *args, **kwargs):
+        """
+        override the histogram observe.
+        """
+        self.apply(*args, **kwargs)
+
+    def record(self, *args, **kwargs):
+        """
+        override the distribution record.
+        """
+        self.apply(*args, **kwargs)
+
+
+FakeStat._stat_class = FakeStat
 
 FakeStatDict = FakeStat
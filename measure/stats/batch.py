@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from collections import OrderedDict
+from copy import copy
+from functools import wraps
+from logging import getLogger
+from operator import add
+import sys
+from threading import Lock
+from weakref import WeakSet
+
+# External Libraries
+from measure.client.base import Metric
+
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
+if sys.version_info >= (3, 5):
+    from inspect import iscoroutinefunction
+
+    from measure.stats import batch_async
+else:
+    batch_async = None
+
+
+logger = getLogger(__name__)
+
+
+if ContextVar is not None:
+    # each thread and asyncio task sees its own batch, tasks inherit the batch of their creator
+    _current = ContextVar('measure_batch', default=None)
+
+    def current_batch():
+        """
+        The batch collecting metrics in this context, or `None`.
+        """
+        return _current.get()
+
+    def _activate(batch):
+        return _current.set(batch)
+
+    def _deactivate(token):
+        _current.reset(token)
+
+else:
+    from threading import local
+
+    _local = local()
+
+    def current_batch():
+        """
+        The batch collecting metrics in this thread, or `None`.
+        """
+        return getattr(_local, 'batch', None)
+
+    def _activate(batch):
+        previous = current_batch()
+        _local.batch = batch
+        return previous
+
+    def _deactivate(previous):
+        _local.batch = previous
+
+
+def _last(old, new):
+    return new
+
+
+# batches that were not sent yet
+_open = WeakSet()
+_open_lock = Lock()
+
+
+def unsent_metrics():
+    """
+    The number of metrics held by batches that were not sent yet, e.g. to count
+    them as dropped at shutdown.
+    """
+    with _open_lock:
+        batches = list(_open)
+    return sum(len(batch) for batch in batches)
+
+
+class Batch(object):
+    """
+    Collects metrics instead of sending them, then sends them all at once with
+    one `apply_many` call per client.
+
+    Counters are summed and gauges keep their last value, every other value
+    (e.g. timings) is kept and sent as is.
+
+        >>> with Batch():
+        >>>     stats.requests.increment()
+        >>>     stats.latency.time(0.2)
+
+        >>> @Batch()
+        >>> def task():
+        >>>     stats.requests.increment()
+
+        >>> async with Batch():
+        >>>     await handle(request)
+
+    A batch entered while another batch is active hands its metrics to the
+    outer batch instead of sending them.
+    """
+
+    # how values for the same stat are combined, keyed by client function
+    coalesce = {
+        'update_stats': add,
+        'gauge': _last,
+    }
+
+    # functions whose value is a sequence of values
+    vector_functions = frozenset(['timing_many'])
+
+    def __init__(self):
+        self._lock = Lock()
+        self._metrics = {}
+        self._clients = {}
+        self._tokens = []
+        self.closed = False
+        with _open_lock:
+            _open.add(self)
+
+    def __len__(self):
+        # no lock, this may be called at shutdown while another thread holds it
+        return sum(
+            len(values) if function not in self.coalesce else 1
+            for metrics in list(self._metrics.values())
+            for (function, _, _, _), values in list(metrics.items())
+        )
+
+    def __enter__(self):
+        self._tokens.append(self.activate())
+        return self
+
+    def __exit__(self, *exc_info):
+        self.deactivate(self._tokens.pop())
+
+        outer = current_batch()
+        if outer is None:
+            self.flush()
+        else:
+            outer.merge(self)
+
+    if batch_async is not None:
+        __aenter__ = batch_async.aenter
+        __aexit__ = batch_async.aexit
+
+    def __call__(self, func):
+        """
+        Decorate a function so that every call runs in its own batch, for a
+        coroutine function every time its coroutine is awaited.
+        """
+        cls = type(self)
+        if batch_async is not None and iscoroutinefunction(func):
+            return batch_async.batch_coroutine_function(cls, func)
+
+        @wraps(func)
+        def decorator(*args, **kwargs):
+            with cls():
+                return func(*args, **kwargs)
+
+        return decorator
+
+    def activate(self):
+        """
+        Make this the current batch for this context.
+
+        :returns: a token to pass back to `deactivate`.
+        """
+        return _activate(self)
+
+    def deactivate(self, token):
+        _deactivate(token)
+
+    def add(self, client, metric):
+        if metric.function in self.vector_functions:
+            # sent later, the caller may reuse its array by then
+            metric = metric._replace(value=copy(metric.value))
+
+        key = id(client)
+        stat = metric.function, metric.name, metric.sample_rate, metric.tags
+        coalesce = self.coalesce.get(metric.function)
+
+        with self._lock:
+            # checked under the lock `flush` closes the batch with, so nothing is added after it drained
+            closed = self.closed
+            if not closed:
+                try:
+                    metrics = self._metrics[key]
+                except KeyError:
+                    self._clients[key] = client
+                    metrics = self._metrics[key] = OrderedDict()
+
+                if coalesce is None:
+                    metrics.setdefault(stat, []).append(metric.value)
+                elif stat in metrics:
+                    metrics[stat] = coalesce(metrics[stat], metric.value)
+                else:
+                    metrics[stat] = metric.value
+
+        if closed:
+            # the batch was sent already, e.g. a task outlived the scope that created it
+            client.apply_many([metric])
+
+    def merge(self, batch):
+        """
+        Take over the metrics collected by another batch.
+        """
+        for client, metric in batch.drain():
+            self.add(client, metric)
+
+    def drain(self, close=False):
+        """
+        Remove every `(client, metric)` collected so far.
+
+        :param bool close: also close the batch, metrics added later are sent right away.
+        :returns: a list of `(client, metric)`.
+        """
+        with self._lock:
+            self.closed = self.closed or close
+            metrics, self._metrics = self._metrics, {}
+            clients, self._clients = self._clients, {}
+
+        return [
+            (clients[key], metric)
+            for key, client_metrics in metrics.items()
+            for metric in self._expand(client_metrics)
+        ]
+
+    def flush(self):
+        """
+        Send everything collected so far and close the batch.
+        """
+        with _open_lock:
+            _open.discard(self)
+
+        sends = OrderedDict()
+        for client, metric in self.drain(close=True):
+            sends.setdefault(id(client), (client, []))[1].append(metric)
+
+        for client, client_metrics in sends.values():
+            try:
+                client.apply_many(client_metrics)
+            except Exception:
+                logger.exception('could not send %d metrics', len(client_metrics))
+
+    # closes like a file, e.g. with `contextlib.closing`
+    close = flush
+
+    def _expand(self, metrics):
+        for (function, name, sample_rate, tags), value in metrics.items():
+            if function in self.coalesce:
+                yield Metric(function, name, value, sample_rate, tags)
+            else:
+                for v in value:
+                    yield Metric(function, name, v, sample_rate, tags)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+The asyncio parts of `Batch`, kept apart as Python 2 can not parse them.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+from functools import wraps
+
+
+async def aenter(batch):
+    return batch.__enter__()
+
+
+async def aexit(batch, *exc_info):
+    return batch.__exit__(*exc_info)
+
+
+def batch_coroutine_function(cls, func):
+    """
+    Decorate a coroutine function so that every call runs in its own batch,
+    entered when the coroutine starts and sent once it finishes.
+    """
+
+    @wraps(func)
+    async def decorator(*args, **kwargs):
+        with cls():
+            return await func(*args, **kwargs)
+
+    return decorator
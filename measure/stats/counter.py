@@ -2,6 +2,10 @@
 
 from __future__ import absolute_import
 
+# External Libraries
+from measure.vectors import total
+
+from .shard import CounterShards
 from .stat import (
     Stat,
     StatDict,
@@ -13,8 +17,11 @@ class Counter(Stat):
     A stat that represents a count over time.
     """
 
+    __slots__ = ()
+
     _function = 'update_stats'
     _alias = 'increment'
+    _shards_class = CounterShards
 
     def __add__(self, n):
         """
@@ -45,6 +52,17 @@ class Counter(Stat):
         """
         self.apply(-abs(n))
 
+    def record_many(self, values):
+        """
+        Add up a sequence, `array.array` or NumPy array of counts and apply the total once.
+
+        >>> stat.record_many([1, 2, 3])
+        """
+        if len(values):
+            self.increment(total(values))
+
 
 class CounterDict(StatDict):
+    __slots__ = ()
+
     _stat_class = Counter
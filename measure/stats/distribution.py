@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from threading import Lock
+
+# External Libraries
+from measure.sketch import DDSketch
+from measure.vectors import is_ndarray
+
+from .stat import (
+    Stat,
+    StatDict,
+)
+
+
+class Distribution(Stat):
+    """
+    Records values into a mergeable quantile sketch (see `measure.sketch`).
+
+    Nothing is sent when recording, `Stats.flush` sends the sketch of the
+    values recorded since the last flush, which the statsd client encodes in
+    a few bytes per bucket. Sketches from many processes can be merged, e.g.
+    by `measure-aggregator`, into exact-to-1% percentiles across all of them.
+
+        >>> stat = Distribution('latency', 'request latency')
+        >>> stat.record(0.05)
+    """
+
+    __slots__ = ('relative_accuracy', 'max_bins', '_sketch', '_lock')
+
+    _function = 'distribution'
+    _alias = 'record'
+
+    def __init__(self, name, doc, parent=None, sample_rate=1, *args, **kwargs):
+        """
+        :param float relative_accuracy: the largest relative error of a percentile, 1% by default.
+        :param int max_bins: bounds the memory of the sketch, the lowest buckets are collapsed past it.
+        """
+        self.relative_accuracy = kwargs.get('relative_accuracy') or 0.01
+        self.max_bins = kwargs.get('max_bins') or 2048
+        self._sketch = self.make_sketch()
+        self._lock = Lock()
+        super(Distribution, self).__init__(name, doc, parent, sample_rate, *args, **kwargs)
+
+    def make_sketch(self):
+        return DDSketch(self.relative_accuracy, self.max_bins)
+
+    def record(self, value):
+        with self._lock:
+            self._sketch.add(value)
+
+    apply = record
+
+    def record_many(self, values):
+        """
+        Record a sequence, `array.array` or NumPy array of values at once.
+        """
+        if is_ndarray(values):
+            values = values.tolist()
+
+        with self._lock:
+            add = self._sketch.add
+            for value in values:
+                add(value)
+
+    def collect(self):
+        with self._lock:
+            sketch, self._sketch = self._sketch, self.make_sketch()
+
+        if not sketch.count:
+            return []
+        return [(self, sketch)]
+
+
+class DistributionDict(StatDict):
+
+    __slots__ = ('relative_accuracy', 'max_bins')
+
+    _stat_class = Distribution
+
+    def __init__(self, *args, **kwargs):
+        self.relative_accuracy = kwargs.pop('relative_accuracy', None)
+        self.max_bins = kwargs.pop('max_bins', None)
+        super(DistributionDict, self).__init__(*args, **kwargs)
+
+    def child_kwargs(self):
+        return {'relative_accuracy': self.relative_accuracy, 'max_bins': self.max_bins}
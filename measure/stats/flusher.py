@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from logging import getLogger
+from threading import (
+    Event,
+    Thread,
+)
+
+
+logger = getLogger(__name__)
+
+
+class Flusher(Thread):
+    """
+    Background thread that flushes a `Stats` every `interval` seconds.
+    """
+
+    def __init__(self, stats, interval):
+        super(Flusher, self).__init__(name='measure-flusher-{0}'.format(stats.prefix))
+        self.daemon = True
+        self.stats = stats
+        self.interval = interval
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.stats.flush()
+            except Exception:
+                logger.exception('could not flush %s', self.stats.prefix)
+
+    def stop(self):
+        self._stopped.set()
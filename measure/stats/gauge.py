@@ -2,6 +2,10 @@
 
 from __future__ import absolute_import
 
+# External Libraries
+from measure.vectors import last
+
+from .shard import GaugeShards
 from .stat import (
     Stat,
     StatDict,
@@ -12,12 +16,24 @@ class Gauge(Stat):
     """
     A discrete number, i.e. not a rate.
     """
+    __slots__ = ()
+
     _function = 'gauge'
     _alias = 'set'
+    _shards_class = GaugeShards
 
     def set(self, n):
         self.apply(n)
 
+    def record_many(self, values):
+        """
+        Set the gauge to the last of many values.
+        """
+        if len(values):
+            self.set(last(values))
+
 
 class GaugeDict(StatDict):
+    __slots__ = ()
+
     _stat_class = Gauge
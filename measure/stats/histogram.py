@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from array import array
+from bisect import bisect_left
+from threading import Lock
+
+# External Libraries
+from measure.vectors import is_ndarray
+
+from .counter import Counter
+from .stat import (
+    Stat,
+    StatDict,
+)
+
+
+def bucket_name(name, bound):
+    """
+    >>> bucket_name('latency', 0.005)
+    'latency.le_0_005'
+    """
+    return '{0}.le_{1}'.format(name, ('%g' % bound).replace('.', '_'))
+
+
+class Histogram(Stat):
+    """
+    Counts observations in fixed buckets.
+
+    Nothing is sent when observing, `Stats.flush` sends the cumulative count of
+    each bucket since the last flush, i.e. `latency.le_0_1` is the number of
+    observations <= 0.1 and `latency.le_inf` is the number of observations.
+
+        >>> stat = Histogram('latency', 'request latency', buckets=(0.01, 0.1, 1))
+        >>> stat.observe(0.05)
+    """
+
+    __slots__ = ('buckets', '_counts', '_sum', '_lock', '_bucket_stats')
+
+    _function = 'update_stats'
+    _alias = 'observe'
+
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, doc, parent=None, sample_rate=1, *args, **kwargs):
+        """
+        :param tuple buckets: the upper bounds of the buckets, an unbounded bucket is always added.
+        """
+        self.buckets = tuple(sorted(kwargs.get('buckets') or self.default_buckets))
+        self._counts = array('L', [0] * (len(self.buckets) + 1))
+        self._sum = 0
+        self._lock = Lock()
+        # every observation is counted, the bucket counts are exact and never sampled
+        self._bucket_stats = [
+            Counter(bucket_name(name, bound), doc, sample_rate=1, tags=kwargs.get('tags'))
+            for bound in self.buckets + (float('inf'),)
+        ]
+        self._bucket_stats.append(Counter(name + '.sum', doc, sample_rate=1, tags=kwargs.get('tags')))
+        super(Histogram, self).__init__(name, doc, parent, sample_rate, *args, **kwargs)
+
+    def set_parent(self, parent):
+        super(Histogram, self).set_parent(parent)
+        for stat in self._bucket_stats:
+            stat.set_parent(parent)
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    apply = observe
+
+    def record_many(self, values):
+        """
+        Observe a sequence, `array.array` or NumPy array of values at once.
+        """
+        if is_ndarray(values):
+            import numpy
+
+            counts = numpy.bincount(
+                numpy.searchsorted(self.buckets, values, side='left'),
+                minlength=len(self._counts),
+            ).tolist()
+            total = values.sum().item()
+        else:
+            counts = [0] * len(self._counts)
+            for value in values:
+                counts[bisect_left(self.buckets, value)] += 1
+            total = sum(values)
+
+        with self._lock:
+            for index, count in enumerate(counts):
+                self._counts[index] += count
+            self._sum += total
+
+    def collect(self):
+        with self._lock:
+            counts, self._counts = self._counts, array('L', [0] * len(self._counts))
+            total, self._sum = self._sum, 0
+
+        if not any(counts):
+            return []
+
+        collected = []
+        cumulative = 0
+        for stat, count in zip(self._bucket_stats, counts):
+            cumulative += count
+            collected.append((stat, cumulative))
+        collected.append((self._bucket_stats[-1], total))
+        return collected
+
+
+class HistogramDict(StatDict):
+
+    __slots__ = ('buckets',)
+
+    _stat_class = Histogram
+
+    def __init__(self, *args, **kwargs):
+        self.buckets = kwargs.pop('buckets', None)
+        super(HistogramDict, self).__init__(*args, **kwargs)
+
+    def child_kwargs(self):
+        return {'buckets': self.buckets}
@@ -10,6 +10,8 @@ class Meter(Counter):
     A positive counter that directly represents a rate.
     """
 
+    __slots__ = ()
+
     def mark(self, n=1):
         """
         stat.mark()
@@ -21,4 +23,6 @@ class Meter(Counter):
 
 
 class MeterDict(StatDict):
+    __slots__ = ()
+
     _stat_class = Meter
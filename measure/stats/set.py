@@ -6,6 +6,8 @@ from .stat import Stat, StatDict
 
 
 class Set(Stat):
+    __slots__ = ()
+
     _function = 'send'
     _alias = 'set'
 
@@ -14,4 +16,6 @@ class Set(Stat):
 
 
 class SetDict(StatDict):
+    __slots__ = ()
+
     _stat_class = Set
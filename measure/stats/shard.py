@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from itertools import count
+from threading import (
+    RLock,
+    current_thread,
+    local,
+)
+from weakref import ref
+
+
+class Shards(object):
+    """
+    A value kept in one cell per thread and merged when it is collected.
+
+    A thread only ever writes to its own cell, so recording never takes a
+    shared lock, the lock is only taken the first time a thread records and when
+    collecting. Cells of threads that have exited are folded into `base`.
+    """
+
+    def __init__(self):
+        self._local = local()
+        self._lock = RLock()
+        self._cells = []
+        self.base = self.empty()
+
+    def empty(self):
+        raise NotImplementedError('empty must be implemented in shards')
+
+    def merge(self, a, b):
+        raise NotImplementedError('merge must be implemented in shards')
+
+    def cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [self.empty()]
+            with self._lock:
+                self._cells.append((ref(current_thread()), cell))
+            return cell
+
+    def merged(self):
+        """
+        Merge every thread's cell, this only reads the cells.
+        """
+        with self._lock:
+            live = []
+            for thread, cell in self._cells:
+                thread = thread()
+                if thread is None or not thread.is_alive():
+                    # no more writes will happen to this cell
+                    self.base = self.merge(self.base, cell[0])
+                else:
+                    live.append((ref(thread), cell))
+            self._cells = live
+
+            value = self.base
+            for _, cell in live:
+                value = self.merge(value, cell[0])
+            return value
+
+
+class CounterShards(Shards):
+    """
+    A running total per thread, `collect` returns what was added since the last collect.
+    """
+
+    def __init__(self):
+        super(CounterShards, self).__init__()
+        self._collected = 0
+
+    def empty(self):
+        return 0
+
+    def merge(self, a, b):
+        return a + b
+
+    def record(self, n):
+        self.cell()[0] += n
+
+    def collect(self):
+        with self._lock:
+            total = self.merged()
+            delta, self._collected = total - self._collected, total
+        return delta or None
+
+
+_sequence = count()
+
+
+class GaugeShards(Shards):
+    """
+    The last value set in each thread, `collect` returns the newest value if it changed.
+    """
+
+    def __init__(self):
+        super(GaugeShards, self).__init__()
+        self._collected = -1
+
+    def empty(self):
+        return (-1, None)
+
+    def merge(self, a, b):
+        return max(a, b, key=lambda cell: cell[0])
+
+    def record(self, value):
+        # a single store, so a collect never sees a half written cell
+        self.cell()[0] = (next(_sequence), value)
+
+    def collect(self):
+        with self._lock:
+            sequence, value = self.merged()
+            if sequence > self._collected:
+                self._collected = sequence
+                return value
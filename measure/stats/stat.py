@@ -4,13 +4,39 @@ from __future__ import absolute_import
 
 # Standard Library
 from logging import getLogger
+from threading import Lock
+from time import time
 
 # External Libraries
-from measure.client.base import BaseClient
+from measure import shutdown
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.stats.batch import (
+    Batch,
+    current_batch,
+)
+from measure.stats.flusher import Flusher
+from measure.tags import (
+    intern_tags,
+    merge_tags,
+)
+from measure.vectors import group
+
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 
 
 logger = getLogger(__name__)
 
+# the most missing stats each `Stats` keeps a shared `FakeStat` for, they are
+# reset once there are more, e.g. when looked up by dynamic names
+max_fake_stats = 1000
+
 
 class Stat(object):
     """
@@ -19,9 +45,15 @@ class Stat(object):
 
     # XXX: make an ABC
 
+    # a StatDict can hold tens of thousands of stats, keep them small
+    __slots__ = ('name', 'doc', 'sample_rate', 'parent', 'aggregate', 'tags', 'full_name', '_own_tags', '_shards')
+
     _function = ''
     _alias = ''
 
+    # the per-thread storage used when the stat aggregates in process
+    _shards_class = None
+
     def __init__(self, name, doc, parent=None, sample_rate=1, *args, **kwargs):
         """
         :param str name: the name the stat will report under.
@@ -29,15 +61,17 @@ class Stat(object):
         :param str prefix: a prefix for the stat to report with e.g. hostname.
         :param Stats parent: the stats container.
         :param float sample_rate: the rate the stat is being sampled at.
+        :param bool aggregate: sum (or keep the last value) in process and only send on `Stats.flush`.
+        :param dict tags: tags to send with the stat, added to the tags of its parent.
         """
-        self.__doc__ = doc
+        self.doc = doc
         self.name = name
         self.sample_rate = sample_rate
+        self.aggregate = kwargs.get('aggregate', False)
+        self._own_tags = intern_tags(kwargs.get('tags'))
+        self._shards = self.make_shards()
         self.set_parent(parent)
 
-        # return a nop function if there is no alias
-        self.__alias = getattr(self, self._alias, lambda *args: None)
-
     def __call__(self, *args, **kwargs):
         """
         A shortcut to allow a default functionality on each stat.
@@ -49,22 +83,64 @@ class Stat(object):
 
         >>> meter_stat()
         """
-        self.__alias(*args, **kwargs)
+        # a nop if there is no alias
+        alias = getattr(self, self._alias, None) if self._alias else None
+        if alias is not None:
+            return alias(*args, **kwargs)
 
     def set_parent(self, parent):
         self.parent = parent
-
-    def apply(self, value):
+        self.tags = merge_tags(getattr(parent, '_tags', None), self._own_tags)
+        # the fully qualified name is built once, not on every apply
+        self.full_name = self.name if parent is None else parent.full_name(self)
+
+    def make_shards(self):
+        if not self.aggregate:
+            return None
+        if self._shards_class is None:
+            raise TypeError('{0} stats can not be aggregated'.format(type(self).__name__))
+        return self._shards_class()
+
+    def apply(self, value, function=None):
         """
         Apply a statsd function to a value
+
+        :param str function: the client function to use instead of the stat's default.
+        """
+        if self._shards is not None:
+            self._shards.record(value)
+        elif function is None:
+            self.parent.apply(self, value)
+        else:
+            self.parent.apply(self, value, function=function)
+
+    def collect(self):
+        """
+        Take the values aggregated since the last collect.
+
+        :returns: a list of `(stat, value)` pairs.
         """
-        self.parent.apply(self, value)
+        if self._shards is not None:
+            value = self._shards.collect()
+            if value is not None:
+                return [(self, value)]
+        return []
 
 
-class StatDict(Stat, dict):
+class StatDict(Stat, MutableMapping):
     """
     Allows for a dictionary of a specific stat type.
+
+    Missing keys create a new stat, every child stat shares the dict's doc.
+    Only lookups with `[]` create stats, `get`, `in`, `pop` and `setdefault`
+    behave as they do on a `dict`.
     """
+
+    __slots__ = ('key_format', 'key_func', 'tag_name', 'max_keys', '_stats')
+
+    # where keys past `max_keys` are counted
+    overflow_key = 'other'
+
     _stat_class = Stat
 
     def __init__(self, *args, **kwargs):
@@ -76,24 +152,112 @@ class StatDict(Stat, dict):
             key_func (callable->str):
                 Function called to get the name for substats. Default value is `self.key_format.format`.
                 The function is called with `key_func(statdict_name, key)`
+            tag_name (str):
+                Tag the substats with `{tag_name: key}` instead of putting the key in their name.
+            max_keys (int):
+                Bounds the number of substats, values for new keys past it are recorded under `overflow_key`.
         """
+        self._stats = {}
         super(StatDict, self).__init__(*args, **kwargs)
 
         self.key_format = kwargs.pop('key_format', '{name}.{key}')
         self.key_func = kwargs.pop('key_func', self.key_format.format)
+        self.tag_name = kwargs.pop('tag_name', None)
+        self.max_keys = kwargs.pop('max_keys', None)
+
+    def make_shards(self):
+        # each child stat keeps its own shards
+        if self.aggregate and self._stat_class._shards_class is None:
+            raise TypeError('{0} stats can not be aggregated'.format(self._stat_class.__name__))
 
     def __missing__(self, key):
 
+        if self.max_keys is not None and len(self._stats) >= self.max_keys and key != self.overflow_key:
+            return self[self.overflow_key]
+
+        if self.tag_name is None:
+            name, tags = self.key_func(name=self.name, key=key), self._own_tags
+        else:
+            name, tags = self.name, merge_tags(self._own_tags, intern_tags({self.tag_name: key}))
+
         default = self._stat_class(
-            self.key_func(name=self.name, key=key),
-            self.__doc__,
+            name,
+            self.doc,
             parent=self.parent,
             sample_rate=self.sample_rate,
+            aggregate=self.aggregate,
+            tags=tags,
+            **self.child_kwargs()
         )
 
         self[key] = default
         return default
 
+    def child_kwargs(self):
+        """
+        Extra arguments for creating child stats.
+        """
+        return {}
+
+    def __getitem__(self, key):
+        try:
+            return self._stats[key]
+        except KeyError:
+            return self.__missing__(key)
+
+    def __setitem__(self, key, stat):
+        self._stats[key] = stat
+
+    def __delitem__(self, key):
+        del self._stats[key]
+
+    def __contains__(self, key):
+        return key in self._stats
+
+    def __iter__(self):
+        return iter(self._stats)
+
+    def __len__(self):
+        return len(self._stats)
+
+    def get(self, key, default=None):
+        return self._stats.get(key, default)
+
+    def pop(self, key, *default):
+        return self._stats.pop(key, *default)
+
+    def popitem(self):
+        return self._stats.popitem()
+
+    def setdefault(self, key, default=None):
+        return self._stats.setdefault(key, default)
+
+    def clear(self):
+        self._stats.clear()
+
+    def record_many(self, keys, values=None):
+        """
+        Record many values at once, values are grouped by key and each child
+        stat records its values with one `record_many` call.
+
+            >>> statdict.record_many([('a', 1), ('b', 2), ('a', 3)])
+            >>> statdict.record_many(keys_array, values_array)
+
+        :param keys: the keys, or `(key, value)` pairs if `values` is not given.
+        :param values: the values, matching `keys` by position.
+        """
+        if values is None:
+            keys, values = zip(*keys) if keys else ((), ())
+
+        for key, key_values in group(keys, values):
+            self[key].record_many(key_values)
+
+    def collect(self):
+        collected = []
+        for stat in list(self.values()):
+            collected.extend(stat.collect())
+        return collected
+
 
 class Stats(object):
     """
@@ -114,11 +278,43 @@ class Stats(object):
         >>> def foo():
         >>>     print 'b'
 
+    Pass `strict=True`, or set `Stats.strict` e.g. in tests, to raise an
+    `AttributeError` when looking up a stat that does not exist.
+
+    Stats are flushed and closed at exit, see `measure.shutdown`.
+
+    Names are made valid for the client's backend by its `name_policy`, or
+    the one passed as `name_policy`, see `measure.names`. Pass
+    `validate_names=True` to raise a `ValueError` for stats added with an
+    invalid name instead, keys of stat dicts are always sanitized.
+
+    Nested namespaces share their parent's client and flushing:
+        >>> db_stats = stats.child('db', Timer('query', 'query latency'))
+        >>> db_stats.query.time(0.1)  # sent as `<prefix>.db.query`
     """
 
+    # raise instead of returning a FakeStat for missing stats
+    strict = False
+
+    # raise for stats added with names the name policy would change
+    validate_names = False
+
     def __init__(self, prefix, *stats, **kwargs):
 
         client = kwargs.pop('client', None)
+        flush_interval = kwargs.pop('flush_interval', None)
+        strict = kwargs.pop('strict', None)
+        tags = kwargs.pop('tags', None)
+        parent = kwargs.pop('parent', None)
+        name_policy = kwargs.pop('name_policy', None)
+        validate_names = kwargs.pop('validate_names', None)
+
+        if parent is not None:
+            client = client or parent.client
+            tags = merge_tags(parent._tags, intern_tags(tags))
+            name_policy = name_policy or parent.name_policy
+            strict = parent.strict if strict is None else strict
+            validate_names = parent.validate_names if validate_names is None else validate_names
 
         if not isinstance(prefix, basestring):
             raise TypeError("first argument must be a prefix string")
@@ -127,32 +323,234 @@ class Stats(object):
             raise TypeError('the client should be an instance of BaseClient')
 
         self.client = client
+        # read from the class, instance attributes of mocked clients are mocks too
+        self.name_policy = name_policy or getattr(client.__class__, 'name_policy', None)
         self.prefix = prefix or ''
+        self._tags = intern_tags(tags)
+        if strict is not None:
+            self.strict = strict
+        if validate_names is not None:
+            self.validate_names = validate_names
+        self.parent = parent
+        self.children = {}
         self.stats = stats
 
         for stat in stats:
             self.add_stat(stat)
 
+        # metrics that were not sent before a flush deadline, underscored like
+        # the tags so stats of any name can be added
+        self._dropped = 0
+        self._closed = False
+
+        self.flusher = None
+        if parent is not None:
+            # flushed and closed with the parent
+            return
+
+        if flush_interval:
+            self.flusher = Flusher(self, flush_interval)
+            self.flusher.start()
+
+        shutdown.register(self)
+
     def add_stat(self, stat):
+        """
+        :raises ValueError: if names are validated and the stat's name is not valid.
+        """
+        if self.validate_names and self.name_policy is not None:
+            self.name_policy.validate(self.prefix + '.' + stat.name)
         stat.set_parent(self)
         setattr(self, stat.name, stat)
+        # stat dicts compare as mappings, look for this very stat
+        if not any(s is stat for s in self.stats):
+            self.stats += (stat,)
 
     def __getitem__(self, key):
         return getattr(self, key)
 
+    def child(self, suffix, *stats, **kwargs):
+        """
+        Get the nested namespace `<prefix>.<suffix>`, it is created the first
+        time and later calls add their stats to it.
+
+        A child sends through its parent's client, is flushed and closed with
+        its parent and sends its parent's tags merged with its own.
+
+        :param str suffix: the name of the namespace, relative to this one.
+        :param stats: stats to add to the namespace.
+        :param dict tags: tags for the namespace, only used when it is created.
+        :returns: a `Stats`.
+        """
+        try:
+            child = self.children[suffix]
+        except KeyError:
+            prefix = self.prefix + '.' + suffix if self.prefix else suffix
+            child = self.children[suffix] = type(self)(prefix, *stats, parent=self, client=self.client, **kwargs)
+        else:
+            for stat in stats:
+                child.add_stat(stat)
+        return child
+
     def __getattr__(self, key):
-        from measure.stats import FakeStat
-        return FakeStat(key, 'the best laid plans often go astray', prefix=self.prefix)
+        """
+        Missing stats are replaced by a shared `FakeStat` per name, or raise an
+        `AttributeError` if the stats are strict.
+        """
+        if key.startswith('__') or self.strict:
+            raise AttributeError('stat <{0}.{1}> does not exist'.format(self.__dict__.get('prefix'), key))
+
+        fakes = self.__dict__.setdefault('_fake_stats', {})
+        try:
+            return fakes[key]
+        except KeyError:
+            from measure.stats import FakeStat
+            if len(fakes) >= max_fake_stats:
+                fakes.clear()
+            return fakes.setdefault(key, FakeStat(key, 'the best laid plans often go astray', parent=self))
+
+    def batch(self, func=None):
+        """
+        Collect every stat applied in this context and send them together.
+
+            >>> with stats.batch():
+            >>>     stats.listPromoted_count.increment()
 
-    def apply(self, stat, value):
-        func = getattr(self.client, stat._function, None)
+            >>> @stats.batch
+            >>> def foo():
+            >>>     stats.listPromoted_count.increment()
 
+            >>> @stats.batch
+            >>> async def bar():
+            >>>     stats.listPromoted_count.increment()
+
+        :returns: a `Batch`, or the decorated function.
+        """
+        batch = Batch()
+        return batch if func is None else batch(func)
+
+    def full_name(self, stat):
+        """
+        The name a stat is sent with, made valid by the name policy. Stats
+        call this once, when they are created.
+        """
         name = self.prefix + '.' + stat.name
+        if self.name_policy is None:
+            return name
+        return self.name_policy.sanitize(name)
+
+    def collect(self):
+        """
+        Take the values of aggregated stats, in this namespace and its children.
+
+        Every value was recorded in process, so the totals are exact and are
+        sent with a sample rate of 1.
+
+        :returns: a list of `Metric`.
+        """
+        metrics = [
+            Metric(stat._function, stat.full_name, value, 1, stat.tags)
+            for s in self.stats
+            for stat, value in s.collect()
+        ]
+        for child in list(self.children.values()):
+            metrics.extend(child.collect())
+        return metrics
+
+    def flush(self, timeout=None):
+        """
+        Send the values of aggregated stats, including those of child
+        namespaces, in one `apply_many` call, then flush the client.
+
+        With a `timeout` collecting and sending happen in a daemon thread that
+        is abandoned after `timeout` seconds, what was not sent by then is
+        logged and added to `_dropped`, values it collects after that are
+        dropped too instead of being sent late. Nothing is waited on in the
+        calling thread, so this is safe in a signal handler that interrupted a
+        thread holding a stat's lock.
+
+        :param float timeout: seconds to wait at most, `None` waits until done.
+        :returns: the number of metrics sent.
+        """
+        if timeout is None:
+            metrics = self.collect()
+            if metrics:
+                self.client.apply_many(metrics)
+            self.client.flush()
+            return len(metrics)
+
+        deadline = time() + timeout
+        lock = Lock()
+        collected = []
+        cancelled = []
+
+        def send():
+            metrics = self.collect()
+            with lock:
+                if not cancelled:
+                    collected.append(len(metrics))
+            if not collected:
+                # the deadline passed while collecting, give up on sending
+                self._drop(len(metrics))
+                return 0
+            if metrics:
+                self.client.apply_many(metrics)
+            return len(metrics)
+
+        finished, sent = shutdown.call_with_timeout(send, timeout)
+        if not finished:
+            with lock:
+                cancelled.append(True)
+            if collected:
+                self._drop(collected[0])
+            else:
+                logger.warning('%s: stats could not be collected before the deadline', self.prefix)
+            return 0
+
+        finished, pending = shutdown.call_with_timeout(self.client.flush, max(0, deadline - time()), max(0, deadline - time()))
+        self._drop(pending or 0)
+        return sent or 0
+
+    def close(self, timeout=None):
+        """
+        Stop the background flusher and flush a last time. The client is left
+        open, it may be shared with other `Stats`.
+
+        :returns: the number of metrics dropped.
+        """
+        if self._closed:
+            return 0
+        self._closed = True
+        shutdown.unregister(self)
+
+        if self.flusher is not None:
+            self.flusher.stop()
+
+        dropped = self._dropped
+        self.flush(timeout)
+        return self._dropped - dropped
+
+    def _drop(self, count):
+        if count:
+            self._dropped += count
+            logger.warning('%s: %d metrics were not sent before the deadline', self.prefix, count)
+
+    def apply(self, stat, value, function=None):
+        function = function or stat._function
+        func = getattr(self.client, function, None)
+
+        name = stat.full_name
 
         if func:
-            func(name, value, sample_rate=stat.sample_rate)
+            batch = current_batch()
+            if batch is not None:
+                batch.add(self.client, Metric(function, name, value, stat.sample_rate, stat.tags))
+            elif stat.tags is None:
+                func(name, value, sample_rate=stat.sample_rate)
+            else:
+                func(name, value, sample_rate=stat.sample_rate, tags=stat.tags)
         else:
-            logger.error('stat %s does not have function %s', name, stat._function)
+            logger.error('stat %s does not have function %s', name, function)
 
 
 class DjangoStats(Stats):
@@ -16,6 +16,8 @@ class Timer(Stat):
     """
     Time based stat that is usable via direct call, decorator, or context manager
     """
+    __slots__ = ()
+
     _function = 'timing'
     _alias = 'time'
 
@@ -78,6 +80,18 @@ class Timer(Stat):
         end = time()
         self.apply(end - start)
 
+    def record_many(self, values):
+        """
+        Record a sequence, `array.array` or NumPy array of durations with a single
+        `timing_many` client call.
+
+            >>> stat.record_many(latencies)
+        """
+        if len(values):
+            self.apply(values, function='timing_many')
+
 
 class TimerDict(StatDict):
+    __slots__ = ()
+
     _stat_class = Timer
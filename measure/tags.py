@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Tags attach dimensions (region, endpoint, status, ...) to a stat without
+putting them in its name.
+
+Tag sets are interned, so equal tags are always the same `TagSet`, and each
+set's wire encodings are computed once when it is created. Interned sets are
+held weakly, a set nothing uses any more is dropped.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+import re
+from threading import Lock
+from weakref import (
+    WeakKeyDictionary,
+    WeakValueDictionary,
+)
+
+
+_interned = WeakValueDictionary()
+_lock = Lock()
+
+# characters that would break the DogStatsD tag suffix
+_invalid = re.compile(r'[,|#:\s]+', re.UNICODE)
+
+
+def sanitize_tag(item):
+    """
+    >>> sanitize_tag('a|b,c:d')
+    'a_b_c_d'
+    """
+    return _invalid.sub('_', '{0}'.format(item))
+
+
+class TagSet(object):
+    """
+    An immutable set of tags, use `intern_tags` to get one.
+
+    :ivar tuple tags: the sorted `(key, value)` pairs.
+    :ivar str statsd: the DogStatsD suffix, e.g. `|#region:us,status:200`, with
+        `,|#:` and whitespace in keys and values replaced by `_`.
+    :ivar list dimensions: the CloudWatch `Dimensions`.
+    """
+
+    __slots__ = ('tags', 'statsd', 'dimensions', '_merged', '__weakref__')
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.statsd = '|#' + ','.join(
+            sanitize_tag(key) if value is None else sanitize_tag(key) + ':' + sanitize_tag(value)
+            for key, value in tags
+        )
+        self.dimensions = [{'Name': key, 'Value': str(value)} for key, value in tags]
+        # merges with other tag sets, dropped with them
+        self._merged = WeakKeyDictionary()
+
+    def __repr__(self):
+        return 'TagSet({0!r})'.format(dict(self.tags))
+
+    def __iter__(self):
+        return iter(self.tags)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def merge(self, other):
+        """
+        Combine with another tag set, tags in `other` win.
+        """
+        try:
+            return self._merged[other]
+        except KeyError:
+            tags = dict(self.tags)
+            tags.update(other.tags)
+            merged = intern_tags(tags)
+            with _lock:
+                self._merged[other] = merged
+            return merged
+
+
+def intern_tags(tags):
+    """
+    Get the shared `TagSet` for some tags.
+
+        >>> intern_tags({'region': 'us'}) is intern_tags([('region', 'us')])
+        True
+
+    :param tags: a dict, `(key, value)` pairs, a `TagSet` or `None`.
+    :returns: a `TagSet`, or `None` if there are no tags.
+    """
+    if not tags:
+        return None
+    if isinstance(tags, TagSet):
+        return tags
+
+    items = tags.items() if hasattr(tags, 'items') else tags
+    key = tuple(sorted(items))
+
+    try:
+        return _interned[key]
+    except KeyError:
+        with _lock:
+            tag_set = _interned.get(key)
+            if tag_set is None:
+                tag_set = _interned[key] = TagSet(key)
+            return tag_set
+
+
+def merge_tags(tags, other):
+    """
+    Merge two interned tag sets that may be `None`, tags in `other` win.
+    """
+    if tags is None:
+        return other
+    if other is None:
+        return tags
+    return tags.merge(other)
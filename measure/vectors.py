@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Reductions over a batch of values that accept sequences, `array.array` or
+NumPy arrays. NumPy arrays are reduced with their own vectorized methods and
+NumPy is never imported unless one is passed in.
+"""
+
+from __future__ import absolute_import
+
+# Standard Library
+from collections import OrderedDict
+
+
+def is_ndarray(values):
+    return hasattr(values, 'dtype') and hasattr(values, 'ndim')
+
+
+def scalar(value):
+    """
+    Turn NumPy scalars into plain python numbers.
+    """
+    item = getattr(value, 'item', None)
+    return item() if item is not None else value
+
+
+def total(values):
+    if is_ndarray(values):
+        return scalar(values.sum())
+    return sum(values)
+
+
+def last(values):
+    return scalar(values[-1])
+
+
+def summarize(values):
+    """
+    :returns: the `(count, sum, minimum, maximum)` of the values.
+    """
+    if is_ndarray(values):
+        if not values.size:
+            return 0, 0, None, None
+        return values.size, scalar(values.sum()), scalar(values.min()), scalar(values.max())
+
+    if not len(values):
+        return 0, 0, None, None
+    return len(values), sum(values), min(values), max(values)
+
+
+def group(keys, values):
+    """
+    Group values by key, keeping the order of each key's first appearance.
+
+    :returns: a list of `(key, values)` pairs.
+    """
+    if is_ndarray(keys) and is_ndarray(values):
+        import numpy
+
+        unique, first, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+        order = numpy.argsort(inverse, kind='stable')
+        splits = numpy.cumsum(numpy.bincount(inverse, minlength=len(unique)))[:-1]
+        grouped = zip(unique.tolist(), numpy.split(values[order], splits))
+        return [grouped_pair for _, grouped_pair in sorted(zip(first.tolist(), grouped), key=lambda pair: pair[0])]
+
+    groups = OrderedDict()
+    for key, value in zip(keys, values):
+        groups.setdefault(key, []).append(value)
+    return list(groups.items())
@@ -51,6 +51,11 @@ setup(
     author='adam hitchcock',
     author_email='adam@northisup.com',
     cmdclass={'test': PyTest},
+    entry_points={
+        'console_scripts': [
+            'measure-aggregator = measure.aggregator:main',
+        ],
+    },
     url='http://github.com/disqus/measure',
     extras_require=requires,
     name=PACKAGE_NAME,
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import sys
+
+
+# uses async syntax, which older interpreters can not parse
+collect_ignore = ['test_batch_async.py'] if sys.version_info < (3, 5) else []
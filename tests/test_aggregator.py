@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import os
+import signal
+import socket
+import time
+from threading import Thread
+
+# External Libraries
+from measure.aggregator import (
+    Aggregator,
+    AggregatorServer,
+    Parser,
+    main,
+)
+from measure.client.base import Metric
+from measure.client.pystatsd import PyStatsdClient
+from measure.tags import intern_tags
+from mock import Mock
+import pytest
+
+
+def test_parse():
+    parser = Parser()
+    parsed = parser.parse(b'a.b:1|c\na.c:0.5|ms|@0.1\n\na.d:2|g|#region:us,debug\nbroken\n')
+
+    assert parsed == [
+        (u'a.b', b'1', b'c', 1, None),
+        (u'a.c', b'0.5', b'ms', 0.1, None),
+        (u'a.d', b'2', b'g', 1, intern_tags([('region', 'us'), ('debug', None)])),
+    ]
+    assert parser.errors == 1
+
+
+def test_parse_caches_names():
+    parser = Parser()
+    first, = parser.parse(b'a.b:1|c')
+    second, = parser.parse(b'a.b:2|c')
+    assert first[0] is second[0]
+
+
+def test_aggregate():
+    client = Mock()
+    aggregator = Aggregator(client)
+    aggregator.feed(b'hits:1|c\nhits:2|c\nhits:1|c|@0.5\nlatency:1|ms\nlatency:3|ms')
+    aggregator.feed(b'users:a|s\nusers:b|s\nusers:a|s\nqueue:5|g\nqueue:-2|g\nbad:x|c\nodd:1|q')
+
+    assert aggregator.flush() == 4
+    metrics = client.apply_many.call_args[0][0]
+    assert sorted(metrics[:2] + metrics[3:]) == [
+        Metric('gauge', 'queue', 3.0, 1, None),
+        Metric('gauge', 'users', 2, 1, None),
+        Metric('update_stats', 'hits', 5.0, 1, None),
+    ]
+    assert metrics[2][:2] == ('timing_many', 'latency')
+    assert list(metrics[2].value) == [1.0, 3.0]
+    assert aggregator.parser.errors == 2
+
+
+def test_aggregate_keeps_tags_apart():
+    client = Mock()
+    aggregator = Aggregator(client)
+    aggregator.feed(b'hits:1|c|#region:us\nhits:1|c|#region:eu\nhits:1|c|#region:us')
+    aggregator.flush()
+
+    metrics = client.apply_many.call_args[0][0]
+    assert sorted((metric.value, metric.tags.tags) for metric in metrics) == [
+        (1.0, (('region', 'eu'),)),
+        (2.0, (('region', 'us'),)),
+    ]
+
+
+def test_gauges_are_remembered_but_sent_when_set():
+    client = Mock()
+    aggregator = Aggregator(client)
+    aggregator.feed(b'queue:5|g')
+    aggregator.flush()
+
+    assert aggregator.flush() == 0
+
+    aggregator.feed(b'queue:+1|g')
+    aggregator.flush()
+    assert client.apply_many.call_args[0][0] == [Metric('gauge', 'queue', 6.0, 1, None)]
+
+
+def test_flush_errors_are_logged():
+    client = Mock()
+    client.apply_many.side_effect = ValueError
+    aggregator = Aggregator(client)
+    aggregator.feed(b'hits:1|c')
+    assert aggregator.flush() == 1
+
+
+@pytest.mark.parametrize('family', ['udp', 'unix'])
+def test_server(family, tmpdir):
+    client = Mock()
+    if family == 'udp':
+        server = AggregatorServer(Aggregator(client), udp=('127.0.0.1', 0), flush_interval=60)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    else:
+        server = AggregatorServer(Aggregator(client), unix=str(tmpdir.join('statsd.sock')), flush_interval=60)
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    thread = Thread(target=server.serve_forever)
+    thread.start()
+    sender.sendto(b'hits:1|c\nhits:1|c', server.address)
+    sender.sendto(b'hits:1|c', server.address)
+
+    deadline = time.time() + 5
+    while server.aggregator.lines < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    server.shutdown()
+    thread.join()
+
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'hits', 3.0, 1, None)])
+    assert server.sockets == []
+
+
+def test_main_builds_client(monkeypatch):
+    served = []
+    monkeypatch.setattr(AggregatorServer, 'serve_forever', lambda self: served.append(self))
+
+    main(['--udp', '127.0.0.1:0', '--client', 'mock.Mock', '--client-option', 'name=forwarder', '--flush-interval', '2'])
+
+    server, = served
+    assert server.flush_interval == 2
+    assert server.aggregator.client._mock_name == 'forwarder'
+    server.close()
+
+
+def test_main_flushes_and_closes_the_client_on_sigterm(monkeypatch):
+    client = Mock()
+    client.close.return_value = 0
+    monkeypatch.setattr('measure.aggregator.import_client', lambda path, **options: client)
+    serve_forever = AggregatorServer.serve_forever
+
+    def serve(self):
+        self.aggregator.feed(b'hits:1|c')
+        os.kill(os.getpid(), signal.SIGTERM)
+        serve_forever(self)
+
+    monkeypatch.setattr(AggregatorServer, 'serve_forever', serve)
+    handler = signal.getsignal(signal.SIGTERM)
+
+    main(['--udp', '127.0.0.1:0', '--client', 'mock.Mock', '--shutdown-timeout', '3'])
+
+    assert [name for name, _, _ in client.mock_calls] == ['apply_many', 'close']
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'hits', 1.0, 1, None)])
+    client.close.assert_called_once_with(3)
+    assert signal.getsignal(signal.SIGTERM) == handler
+
+
+def test_main_needs_a_client():
+    with pytest.raises(SystemExit):
+        main(['--udp', '127.0.0.1:0'])
+
+
+def test_main_needs_a_statsd_target(monkeypatch):
+    monkeypatch.setattr(AggregatorServer, 'serve_forever', Mock())
+    with pytest.raises(SystemExit):
+        main(['--udp', '127.0.0.1:0', '--client', 'measure.client.PyStatsdClient'])
+    assert not AggregatorServer.serve_forever.called
+
+
+@pytest.mark.parametrize('udp', ['127.0.0.1:8125', ':8125', 'localhost:8125'])
+def test_main_refuses_to_forward_to_itself(monkeypatch, udp):
+    monkeypatch.setattr(AggregatorServer, 'serve_forever', Mock())
+    with pytest.raises(SystemExit):
+        main(['--udp', udp, '--client', 'measure.client.PyStatsdClient', '--client-option', 'host=127.0.0.1',
+              '--client-option', 'port=8125', '--client-option', 'resolve_interval='])
+    assert not AggregatorServer.serve_forever.called
+
+
+def test_main_forwards_to_another_port(monkeypatch):
+    served = []
+    monkeypatch.setattr(AggregatorServer, 'serve_forever', lambda self: served.append(self))
+
+    main(['--udp', '127.0.0.1:0', '--client', 'measure.client.PyStatsdClient', '--client-option', 'host=127.0.0.1',
+          '--client-option', 'port=8126', '--client-option', 'resolve_interval='])
+
+    server, = served
+    assert isinstance(server.aggregator.client, PyStatsdClient)
+    server.close()
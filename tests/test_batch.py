@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from threading import Thread
+
+# External Libraries
+from measure import (
+    Counter,
+    Gauge,
+    Stats,
+    Timer,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.pystatsd import PyStatsdClient
+from measure.client.recording import RecordingClient
+from measure.stats.batch import (
+    Batch,
+    current_batch,
+)
+from mock import (
+    MagicMock,
+    Mock,
+)
+import pytest
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats(
+        'prefix',
+        Counter('c', 'cdoc'),
+        Gauge('g', 'gdoc'),
+        Timer('t', 'tdoc'),
+        client=client,
+    )
+
+
+def sent(client):
+    assert client.apply_many.call_count == 1
+    return client.apply_many.call_args[0][0]
+
+
+def test_batch_coalesces(client, stats):
+    with stats.batch():
+        stats.c.increment(2)
+        stats.g.set(1)
+        stats.t.time(0.1)
+        stats.c.decrement()
+        stats.g.set(5)
+        stats.t.time(0.2)
+
+        assert not client.apply_many.called
+        assert not client.update_stats.called
+
+    assert sent(client) == [
+        Metric('update_stats', 'prefix.c', 1, 1),
+        Metric('gauge', 'prefix.g', 5, 1),
+        Metric('timing', 'prefix.t', 0.1, 1),
+        Metric('timing', 'prefix.t', 0.2, 1),
+    ]
+    assert current_batch() is None
+
+
+def test_batch_decorator(client, stats):
+    @stats.batch
+    def work(n):
+        stats.c.increment(n)
+        return n
+
+    assert work(3) == 3
+    assert sent(client) == [Metric('update_stats', 'prefix.c', 3, 1)]
+
+
+def test_nested_batch_merges_into_outer(client, stats):
+    with stats.batch():
+        stats.c.increment()
+        with stats.batch():
+            stats.c.increment()
+        assert not client.apply_many.called
+
+    assert sent(client) == [Metric('update_stats', 'prefix.c', 2, 1)]
+
+
+def test_batch_is_per_thread(client, stats):
+    def work():
+        assert current_batch() is None
+        stats.c.increment()
+
+    with stats.batch():
+        thread = Thread(target=work)
+        thread.start()
+        thread.join()
+
+        client.update_stats.assert_called_with('prefix.c', 1, sample_rate=1)
+
+
+def test_closed_batch_sends_directly(client, stats):
+    with stats.batch() as batch:
+        pass
+
+    batch.add(client, Metric('update_stats', 'prefix.c', 1, 1))
+    client.apply_many.assert_called_with([Metric('update_stats', 'prefix.c', 1, 1)])
+
+
+def test_no_metric_is_lost_while_flushing():
+    client = RecordingClient()
+    batch = Batch()
+
+    def add():
+        for _ in range(2000):
+            batch.add(client, Metric('timing', 'prefix.t', 1, 1))
+
+    threads = [Thread(target=add) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    batch.flush()
+    for thread in threads:
+        thread.join()
+    batch.flush()
+
+    assert client.count('prefix.t') == 8000
+
+
+def test_pystatsd_apply_many_packs_datagrams():
+    client = PyStatsdClient(resolve_interval=None)
+    client.client.udp_sock = Mock()
+    client.max_packet_size = 20
+
+    client.apply_many([
+        Metric('update_stats', 'a', 1, 1),
+        Metric('update_stats', 'b', 2, 1),
+        Metric('timing', 'c', 0.5, 1),
+    ])
+
+    packets = [call[0][0] for call in client.client.udp_sock.sendto.call_args_list]
+    assert packets == [b'a:1|c\nb:2|c', b'c:0.500000|ms']
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import asyncio
+
+# External Libraries
+from measure import (
+    Counter,
+    Stats,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.stats.batch import (
+    Batch,
+    current_batch,
+)
+from mock import MagicMock
+import pytest
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats('prefix', Counter('c', 'cdoc'), client=client)
+
+
+def test_batch_decorates_coroutine_functions(client, stats):
+    @stats.batch
+    async def handler(n):
+        stats.c.increment()
+        await asyncio.sleep(0)
+        stats.c.increment(n)
+        assert not client.apply_many.called
+        return n
+
+    assert asyncio.run(handler(2)) == 2
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'prefix.c', 3, 1)])
+    assert not client.update_stats.called
+
+
+def test_each_task_has_its_own_batch(client, stats):
+    @stats.batch
+    async def handler(n):
+        await asyncio.sleep(0)
+        stats.c.increment(n)
+
+    async def main():
+        await asyncio.gather(handler(1), handler(2))
+
+    asyncio.run(main())
+    assert sorted(call[0][0][0].value for call in client.apply_many.call_args_list) == [1, 2]
+
+
+def test_async_with(client, stats):
+    async def handler():
+        async with Batch() as batch:
+            assert current_batch() is batch
+            stats.c.increment()
+            await asyncio.sleep(0)
+            stats.c.increment()
+        assert current_batch() is None
+
+    asyncio.run(handler())
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'prefix.c', 2, 1)])
@@ -8,6 +8,7 @@ def boto3client_mock():
     return Boto3Client(
         aws_access_key_id='FOOBARBAZ',
         aws_secret_access_key='BAZBARFOO',
+        workers=0,
     )
 
 
@@ -25,3 +26,98 @@ def namespaces(request):
 def test_split_prefix_name(namespaces, boto3client_mock):
     namespace, split = namespaces
     assert boto3client_mock.split_prefix_name(namespace) == split
+
+
+def test_timing_many_sends_statistic_set(boto3client_mock):
+    from mock import Mock
+
+    boto3client_mock.client = Mock()
+    boto3client_mock.timing_many('foo.bar', [0.5, 0.25, 1.0])
+
+    boto3client_mock.client.put_metric_data.assert_called_once_with(
+        Namespace='foo',
+        MetricData=[{
+            'MetricName': 'bar',
+            'StatisticValues': {'SampleCount': 3.0, 'Sum': 1.75, 'Minimum': 0.25, 'Maximum': 1.0},
+            'Unit': 'Seconds',
+        }],
+    )
+
+
+def test_tags_are_sent_as_dimensions(boto3client_mock):
+    from mock import Mock
+    from measure.tags import intern_tags
+
+    boto3client_mock.client = Mock()
+    boto3client_mock.update_stats('foo.bar', 1, tags=intern_tags({'region': 'us'}))
+
+    datum = boto3client_mock.client.put_metric_data.call_args[1]['MetricData'][0]
+    assert datum['Dimensions'] == [{'Name': 'region', 'Value': 'us'}]
+
+
+def test_apply_many_batches_by_namespace(boto3client_mock):
+    from mock import Mock
+    from measure.client.base import Metric
+
+    boto3client_mock.client = Mock()
+    boto3client_mock.max_batch_size = 2
+    boto3client_mock.apply_many([
+        Metric('update_stats', 'foo.a', 1, 1),
+        Metric('gauge', 'foo.b', 2, 1),
+        Metric('timing', 'foo.c', 0.5, 1),
+        Metric('update_stats', 'bar.a', 3, 1),
+    ])
+
+    calls = boto3client_mock.client.put_metric_data.call_args_list
+    assert [(call[1]['Namespace'], len(call[1]['MetricData'])) for call in calls] == [('foo', 2), ('foo', 1), ('bar', 1)]
+    assert calls[1][1]['MetricData'] == [{'MetricName': 'c', 'Value': 0.5, 'Unit': 'Seconds'}]
+
+
+def test_sends_in_the_background():
+    from mock import Mock
+
+    client = Boto3Client(aws_access_key_id='FOOBARBAZ', aws_secret_access_key='BAZBARFOO', workers=2)
+    client.client = Mock()
+    client.update_stats('foo.bar', 1)
+    client.timing('foo.baz', 0.5)
+
+    assert client.flush(timeout=5) == 0
+    assert client.client.put_metric_data.call_count == 2
+    assert client.close(timeout=5) == 0
+
+
+def test_throttling_is_retried():
+    from botocore.exceptions import ClientError
+    from measure.client.boto3 import is_retryable
+
+    throttled = ClientError({'Error': {'Code': 'Throttling'}}, 'PutMetricData')
+    unavailable = ClientError({'ResponseMetadata': {'HTTPStatusCode': 503}}, 'PutMetricData')
+    invalid = ClientError({'Error': {'Code': 'InvalidParameterValue'}}, 'PutMetricData')
+
+    assert is_retryable(throttled)
+    assert is_retryable(unavailable)
+    assert not is_retryable(invalid)
+    assert not is_retryable(ValueError())
+
+
+def test_gauge(boto3client_mock):
+    from mock import Mock
+
+    boto3client_mock.client = Mock()
+    boto3client_mock.gauge('foo.bar', 3)
+
+    datum = boto3client_mock.client.put_metric_data.call_args[1]['MetricData'][0]
+    assert datum == {'MetricName': 'bar', 'Value': 3, 'Unit': 'None'}
+
+
+def test_queued_data_is_copied():
+    from mock import Mock
+
+    client = Boto3Client(aws_access_key_id='FOOBARBAZ', aws_secret_access_key='BAZBARFOO', workers=1)
+    client.executor.submit = Mock()
+    data = [{'MetricName': 'bar', 'Value': 1, 'Unit': 'None'}]
+    client.put_metric_data('foo', data)
+    del data[:]
+
+    assert client.executor.submit.call_args[0] == ('foo', [{'MetricName': 'bar', 'Value': 1, 'Unit': 'None'}])
+    client.close()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import random
+
+# External Libraries
+from measure import (
+    Counter,
+    Distribution,
+    DistributionDict,
+    Stats,
+)
+from measure.aggregator import Aggregator
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.boto3 import coarsen
+from measure.client.pystatsd import PyStatsdClient
+from measure.client.recording import RecordingClient
+from measure.client.test import TestStatsdClient as StatsdTestClient
+from measure.sketch import DDSketch
+from mock import Mock
+import pytest
+
+
+@pytest.fixture
+def values():
+    rng = random.Random(7)
+    return [rng.lognormvariate(0, 1) for _ in range(20000)]
+
+
+def sketch_of(values, **kwargs):
+    sketch = DDSketch(**kwargs)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize('q', [0.1, 0.5, 0.9, 0.99])
+def test_quantiles_are_within_relative_accuracy(values, q):
+    sketch = sketch_of(values + [0, -2.5])
+    expected = sorted(values + [0, -2.5])[int(q * (len(values) + 1))]
+    assert sketch.quantile(q) == pytest.approx(expected, rel=0.02)
+
+
+def test_quantile_edges():
+    sketch = sketch_of([-1, 0, 3])
+    assert sketch.quantile(0) == -1
+    assert sketch.quantile(1) == 3
+    assert DDSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        sketch.quantile(2)
+
+
+def test_round_trip(values):
+    sketch = sketch_of(values + [0, -1])
+    decoded = DDSketch.from_string(sketch.to_string())
+
+    assert decoded.count == sketch.count
+    assert decoded.bins() == sketch.bins()
+    assert (decoded.sum, decoded.min, decoded.max) == (sketch.sum, sketch.min, sketch.max)
+    # a few bytes per bucket
+    assert len(sketch.to_bytes()) < 4 * len(sketch.bins()) + 64
+
+
+def test_merge_equals_one_sketch(values):
+    merged = sketch_of(values[:5000])
+    merged.merge(sketch_of(values[5000:]))
+    assert merged.bins() == sketch_of(values).bins()
+
+    with pytest.raises(ValueError):
+        merged.merge(DDSketch(relative_accuracy=0.05))
+
+
+def test_bins_are_bounded(values):
+    sketch = sketch_of(values, max_bins=200)
+    assert len(sketch.positive.bins) == 200
+    assert sketch.count == len(values)
+    assert sketch.quantile(0.99) == pytest.approx(sorted(values)[int(0.99 * len(values))], rel=0.02)
+
+
+def test_distribution_stat():
+    client = RecordingClient()
+    stats = Stats(
+        'app',
+        Distribution('latency', 'doc'),
+        DistributionDict('by_route', 'doc', relative_accuracy=0.05, max_bins=64),
+        client=client,
+    )
+    stats.latency.record(0.5)
+    stats.latency.record_many([0.25, 1.0])
+    stats.by_route['home'](2)
+
+    assert stats.by_route['home'].max_bins == 64
+    assert stats.flush() == 2
+    assert client.total('app.latency', 'distribution') == 3
+    assert client.sketches['app.latency'].quantile(1) == 1.0
+    assert client.sketches['app.by_route.home'].relative_accuracy == 0.05
+
+    assert stats.flush() == 0
+
+
+def test_non_finite_values_are_skipped():
+    sketch = sketch_of([1, float('nan'), float('inf'), float('-inf'), 2])
+    assert sketch.count == 2
+    assert sketch.quantile(1) == 2
+
+    stat = Distribution('latency', 'doc')
+    stat.record(float('nan'))
+    stat.record_many([float('inf'), 1])
+    assert stat.collect()[0][1].count == 1
+
+
+class CountingClient(BaseClient):
+
+    def __init__(self):
+        self.counts = []
+
+    def update_stats(self, name, value, sample_rate=1):
+        self.counts.append((name, value))
+
+
+@pytest.mark.parametrize('client_class', [CountingClient, StatsdTestClient])
+def test_clients_without_sketches_still_flush(client_class):
+    client = client_class()
+    stats = Stats('app', Distribution('latency', 'doc'), Counter('hits', 'doc', aggregate=True), client=client)
+    stats.latency.record(0.5)
+    stats.hits.increment()
+
+    assert stats.flush() == 2
+    if client_class is CountingClient:
+        assert client.counts == [('app.hits', 1)]
+
+
+def test_a_failing_metric_does_not_stop_the_others():
+    client = CountingClient()
+    client.apply_many([
+        Metric('timing', 'app.t', 1, 1),
+        Metric('update_stats', 'app.c', 1, 1),
+    ])
+    assert client.counts == [('app.c', 1)]
+
+
+def test_statsd_line():
+    client = PyStatsdClient(resolve_interval=None)
+    client.client.udp_sock = Mock()
+    sketch = sketch_of([1, 2, 3])
+    client.distribution('latency', sketch)
+
+    packet = client.client.udp_sock.sendto.call_args[0][0]
+    assert packet == 'latency:{0}|dds'.format(sketch.to_string()).encode('ascii')
+
+
+def test_aggregator_merges_sketches_across_processes(values):
+    client = Mock()
+    aggregator = Aggregator(client)
+    for chunk in (values[:10000], values[10000:]):
+        aggregator.feed('latency:{0}|dds\nlatency:{1}|d'.format(sketch_of(chunk).to_string(), 1.5).encode('ascii'))
+    aggregator.feed(b'latency:not-a-sketch|dds')
+
+    assert aggregator.flush() == 1
+    metric, = client.apply_many.call_args[0][0]
+    assert metric[:2] == ('distribution', 'latency')
+    assert metric.value.count == len(values) + 2
+    assert aggregator.parser.errors == 1
+
+
+def test_boto3_values_and_counts(values):
+    from measure.client import Boto3Client
+
+    client = Boto3Client(aws_access_key_id='FOOBARBAZ', aws_secret_access_key='BAZBARFOO', workers=0)
+    client.client = Mock()
+    client.apply_many([Metric('distribution', 'app.latency', sketch_of(values), 1)])
+
+    datum, = client.client.put_metric_data.call_args[1]['MetricData']
+    assert datum['MetricName'] == 'latency'
+    assert len(datum['Values']) <= client.max_datum_values
+    assert sum(datum['Counts']) == len(values)
+
+
+def test_coarsen():
+    bins = [(1.0, 1), (2.0, 1), (3.0, 2), (5.0, 1)]
+    assert coarsen(bins, 4) is bins
+    assert coarsen(bins, 2) == [(1.5, 2), (11 / 3.0, 3)]
@@ -20,8 +20,28 @@ SECURE_PROXY_SSL_HEADER = ('SSL_ON', '1')
 STATSD_HOST = 'localhost',
 STATSD_PORT = '1235',
 STATS_CLIENT = __name__ + '.StatsClient'
+ROOT_URLCONF = __name__
+MIDDLEWARE = ['measure.middleware.StatsMiddleware']
 
 stats_client = Mock(spec=BaseClient)
+stats_client.flush.return_value = 0
+stats_client.close.return_value = 0
+
+
+def home(request):
+    from django.http import HttpResponse
+
+    DjangoStats('app', Meter('views', doc='views')).views.mark()
+    return HttpResponse('hi', status=201)
+
+
+try:
+    from django.urls import re_path
+except ImportError:
+    # Django < 2.0
+    from django.conf.urls import url as re_path
+
+urlpatterns = [re_path(r'^$', home, name='home')]
 
 
 def StatsClient(*args, **kwargs):
@@ -40,3 +60,59 @@ def test_django_client():
     stats.ho.mark(5)
 
     stats.client.update_stats.assert_called_with('hi.ho', 5, sample_rate=1)
+
+
+def test_middleware_batches_until_response_is_closed():
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from measure.middleware import StatsMiddleware
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = __name__
+    stats_client.reset_mock()
+
+    stats = DjangoStats('app', Meter('views', doc='views'))
+
+    def view(request):
+        request.resolver_match = Mock(view_name='home')
+        stats.views.mark()
+        return HttpResponse('hi', status=201)
+
+    response = StatsMiddleware(view)(RequestFactory().get('/'))
+
+    assert not stats_client.update_stats.called
+    assert not stats_client.timing.called
+    assert not stats_client.apply_many.called
+
+    response.close()
+
+    assert stats_client.apply_many.call_count == 1
+    metrics = stats_client.apply_many.call_args[0][0]
+    assert [(m.function, m.name) for m in metrics] == [
+        ('update_stats', 'app.views'),
+        ('timing', 'django.response.home.201'),
+    ]
+
+
+def test_wsgi_handler_flushes_once_the_server_closes_the_response():
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = __name__
+    application = get_wsgi_application()
+    stats_client.reset_mock()
+
+    start_response = Mock()
+    response = application(RequestFactory()._base_environ(PATH_INFO='/'), start_response)
+
+    assert start_response.call_args[0][0].startswith('201')
+    assert b''.join(response) == b'hi'
+    assert not stats_client.apply_many.called
+
+    response.close()
+
+    metrics = stats_client.apply_many.call_args[0][0]
+    assert [(m.function, m.name) for m in metrics] == [
+        ('update_stats', 'app.views'),
+        ('timing', 'django.response.home.201'),
+    ]
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from threading import Event
+
+# External Libraries
+from measure.client.executor import (
+    Executor,
+    TokenBucket,
+)
+from mock import (
+    Mock,
+    patch,
+)
+import pytest
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    with patch('measure.client.executor.time', return_value=100.0):
+        bucket = TokenBucket(10, burst=2)
+        assert bucket.delay() == 0
+        assert bucket.delay() == 0
+        assert bucket.delay() == pytest.approx(0.1)
+        assert bucket.delay() == pytest.approx(0.2)
+
+    with patch('measure.client.executor.time', return_value=101.0):
+        assert bucket.delay() == 0
+
+
+def test_executor_runs_calls():
+    func = Mock()
+    executor = Executor(func, workers=2)
+    for i in range(10):
+        executor.submit(i, key=i)
+
+    assert executor.flush(timeout=5) == 0
+    assert sorted(call[0][0] for call in func.call_args_list) == list(range(10))
+    assert executor.close(timeout=5) == 0
+
+
+def test_full_queue_drops():
+    release = Event()
+    executor = Executor(lambda: release.wait(5), workers=1, max_queue_size=1)
+    for _ in range(5):
+        executor.submit()
+
+    assert executor.dropped >= 3
+    assert executor.flush(timeout=0.05) >= 1
+    release.set()
+    assert executor.close(timeout=5) == 0
+
+
+def test_retries_with_jitter():
+    func = Mock(side_effect=[ValueError('throttled'), ValueError('throttled'), None])
+    executor = Executor(func, workers=0, retryable=lambda error: True, retries=3, backoff=0.01)
+
+    with patch('measure.client.executor.sleep') as sleep:
+        assert executor.call('a')
+
+    assert func.call_count == 3
+    assert [call[0][0] <= 0.01 * 2 ** i for i, call in enumerate(sleep.call_args_list)] == [True, True]
+
+
+def test_gives_up():
+    func = Mock(side_effect=ValueError('bad request'))
+    executor = Executor(func, workers=0, retryable=lambda error: False)
+
+    assert not executor.call()
+    assert func.call_count == 1
+    assert executor.dropped == 1
+
+
+def test_closed_executor_drops_calls():
+    func = Mock()
+    executor = Executor(func, workers=1)
+    assert executor.close(timeout=5) == 0
+
+    executor.submit(1)
+    assert executor.dropped == 1
+    # returns at once, no thread is left to run anything
+    assert executor.flush() == 0
+    assert executor.close(timeout=5) == 0
+    assert not func.called
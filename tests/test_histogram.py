@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from array import array
+
+# External Libraries
+from measure import (
+    Histogram,
+    HistogramDict,
+    Stats,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.stats.histogram import bucket_name
+from mock import MagicMock
+import pytest
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats(
+        'prefix',
+        Histogram('h', 'hdoc', buckets=(1, 0.1, 0.5)),
+        HistogramDict('hd', 'hddoc', buckets=(1,)),
+        client=client,
+    )
+
+
+def flushed(stats, client):
+    stats.flush()
+    return dict((metric.name, metric.value) for metric in client.apply_many.call_args[0][0])
+
+
+@pytest.mark.parametrize('bound, expected', [
+    (0.005, 'h.le_0_005'),
+    (10, 'h.le_10'),
+    (float('inf'), 'h.le_inf'),
+])
+def test_bucket_name(bound, expected):
+    assert bucket_name('h', bound) == expected
+
+
+def test_observe_is_sent_on_flush(client, stats):
+    for value in (0.05, 0.1, 0.3, 2, 2):
+        stats.h.observe(value)
+
+    assert not client.update_stats.called
+    assert flushed(stats, client) == {
+        'prefix.h.le_0_1': 2,
+        'prefix.h.le_0_5': 3,
+        'prefix.h.le_1': 3,
+        'prefix.h.le_inf': 5,
+        'prefix.h.sum': 4.45,
+    }
+    assert client.apply_many.call_args[0][0][0] == Metric('update_stats', 'prefix.h.le_0_1', 2, 1)
+
+
+def test_sampled_histogram_sends_exact_counts(client):
+    stats = Stats('prefix', Histogram('h', 'hdoc', buckets=(1,), sample_rate=0.1), client=client)
+    stats.h.observe(0.5)
+    stats.flush()
+
+    assert all(stat.sample_rate == 1 for stat in stats.h._bucket_stats)
+    assert sorted(client.apply_many.call_args[0][0]) == [
+        Metric('update_stats', 'prefix.h.le_1', 1, 1),
+        Metric('update_stats', 'prefix.h.le_inf', 1, 1),
+        Metric('update_stats', 'prefix.h.sum', 0.5, 1),
+    ]
+
+
+def test_flush_resets(client, stats):
+    stats.h(0.05)
+    stats.flush()
+    client.reset_mock()
+
+    stats.flush()
+    assert not client.apply_many.called
+
+
+@pytest.mark.parametrize('container', [list, lambda values: array('d', values)])
+def test_record_many(client, stats, container):
+    stats.h.record_many(container([0.05, 0.1, 0.3, 2, 2]))
+    assert flushed(stats, client)['prefix.h.le_0_5'] == 3
+
+
+def test_record_many_numpy(client, stats):
+    numpy = pytest.importorskip('numpy')
+    stats.h.record_many(numpy.array([0.05, 0.1, 0.3, 2, 2]))
+    assert flushed(stats, client)['prefix.h.le_0_1'] == 2
+
+
+def test_histogram_dict(client, stats):
+    stats.hd['a'].observe(0.5)
+    assert stats.hd['a'].buckets == (1,)
+    assert flushed(stats, client) == {
+        'prefix.hd.a.le_1': 1,
+        'prefix.hd.a.le_inf': 1,
+        'prefix.hd.a.sum': 0.5,
+    }
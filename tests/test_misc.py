@@ -18,3 +18,11 @@ def test_subclassing():
             super(SuperStats, self).__init__(*args, **kwargs)
 
     SuperStats('prefix')
+
+
+def test_import_does_not_load_boto3():
+    import subprocess
+    import sys
+
+    script = 'import sys, measure; sys.exit("boto3" in sys.modules)'
+    assert subprocess.call([sys.executable, '-c', script]) == 0
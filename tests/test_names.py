@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# External Libraries
+from measure import (
+    Counter,
+    CounterDict,
+    Stats,
+)
+from measure.aggregator import Aggregator
+from measure.client.base import BaseClient
+from measure.names import (
+    CloudWatchNamePolicy,
+    NamePolicy,
+    StatsdNamePolicy,
+)
+from mock import (
+    MagicMock,
+    patch,
+)
+import pytest
+
+
+class StatsdClient(BaseClient):
+    name_policy = StatsdNamePolicy()
+
+    def __init__(self):
+        self.sent = []
+
+    def update_stats(self, name, value, sample_rate=1):
+        self.sent.append(name)
+
+    def apply_many(self, metrics):
+        self.sent.extend(metric.name for metric in metrics)
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('api.requests', 'api.requests'),
+    ('api.GET /users|200', 'api.GET_users_200'),
+    ('api.a:b@c#d\ne', 'api.a_b_c_d_e'),
+    ('api.with-dash_and.dots', 'api.with-dash_and.dots'),
+])
+def test_statsd_policy(name, expected):
+    assert StatsdNamePolicy().sanitize(name) == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('app.web.requests', 'app.web.requests'),
+    ('app.web|x.GET /users', 'app.web_x.GET /users'),
+    (u'app.latency µs ', 'app.latency _s'),
+    ('app.' + 'x' * 300, 'app.' + 'x' * 255),
+    ('app.\t', 'app._'),
+])
+def test_cloudwatch_policy(name, expected):
+    assert CloudWatchNamePolicy().sanitize(name) == expected
+
+
+def test_memo_is_bounded():
+    policy = StatsdNamePolicy()
+    policy.max_cached = 2
+
+    with patch.object(policy, 'clean', wraps=policy.clean) as clean:
+        for name in ['a b', 'a b', 'c d', 'e f', 'a b']:
+            policy.sanitize(name)
+
+    assert clean.call_count == 4
+    assert len(policy._memo) <= 2
+
+
+def test_validate():
+    policy = StatsdNamePolicy()
+    assert policy.validate('a.b') == 'a.b'
+    with pytest.raises(ValueError, match="try 'a.b_c'"):
+        policy.validate('a.b c')
+
+
+def test_names_are_sanitized_once_at_creation():
+    client = StatsdClient()
+    stats = Stats('app', Counter('hits', 'doc'), CounterDict('paths', 'doc'), client=client)
+
+    with patch.object(StatsdClient.name_policy, 'clean', wraps=StatsdClient.name_policy.clean) as clean:
+        for _ in range(3):
+            stats.paths['/users/me'].increment()
+            stats.hits.increment()
+
+    assert clean.call_count == 1
+    assert client.sent == ['app.paths._users_me', 'app.hits'] * 3
+
+
+def test_validated_stats_reject_invalid_names():
+    stats = Stats('app', client=StatsdClient(), validate_names=True)
+    with pytest.raises(ValueError):
+        stats.add_stat(Counter('bad name', 'doc'))
+
+    child = stats.child('db', CounterDict('queries', 'doc'))
+    with pytest.raises(ValueError):
+        child.add_stat(Counter('bad name', 'doc'))
+
+    # keys are only known at runtime, they are always sanitized
+    assert child.queries['select *'].full_name == 'app.db.queries.select_'
+
+
+def test_strict_stats_sanitize_names():
+    client = StatsdClient()
+    stats = Stats('app', Counter('a b', 'doc'), CounterDict('paths', 'doc'), client=client, strict=True)
+    stats.paths['/users/me'].increment()
+    stats['a b'].increment()
+    assert client.sent == ['app.paths._users_me', 'app.a_b']
+
+
+def test_policy_can_be_passed():
+    policy = NamePolicy()
+    stats = Stats('app', Counter('a b', 'doc'), client=StatsdClient(), name_policy=policy)
+    assert stats.child('db').name_policy is policy
+    assert stats['a b'].full_name == 'app.a b'
+
+
+def test_mocked_clients_have_no_policy():
+    stats = Stats('app', Counter('a b', 'doc'), client=MagicMock(spec=BaseClient))
+    assert stats.name_policy is None
+
+
+def test_aggregator_uses_the_client_policy():
+    aggregator = Aggregator(StatsdClient())
+    aggregator.feed(b'app.GET /users:1|c\napp.caf\xff:1|c')
+    aggregator.flush()
+
+    assert aggregator.client.sent == ['app.GET_users']
+    assert aggregator.parser.errors == 1
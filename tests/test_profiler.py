@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import sys
+import time
+from threading import Thread
+
+# External Libraries
+from measure import Stats
+from measure.client import RecordingClient
+from measure.profiler import SamplingProfiler
+import pytest
+
+
+@pytest.fixture
+def client():
+    return RecordingClient()
+
+
+@pytest.fixture
+def stats(client):
+    return Stats('app', client=client)
+
+
+def spin(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+def leaf_frame():
+    return sys._getframe()
+
+
+def test_sample_and_report(stats, client):
+    profiler = SamplingProfiler(stats)
+    frame = leaf_frame()
+    profiler.sample([frame, frame])
+
+    assert profiler.report() == 1
+    client.assert_recorded('app.profile.samples.tests_test_profiler-leaf_frame', count=1, total=2)
+    client.assert_recorded('app.profile.time.tests_test_profiler-leaf_frame', count=1)
+    assert profiler.report() == 0
+
+
+def test_by_module(stats, client):
+    profiler = SamplingProfiler(stats, by='module')
+    profiler.sample([leaf_frame()])
+    profiler.report()
+    client.assert_recorded('app.profile.samples.tests_test_profiler', total=1)
+
+
+def test_max_keys(stats, client):
+    profiler = SamplingProfiler(stats, max_keys=1)
+    profiler.sample([leaf_frame(), sys._getframe()])
+    profiler.report()
+
+    assert client.names() == {
+        'app.profile.samples.tests_test_profiler-leaf_frame',
+        'app.profile.time.tests_test_profiler-leaf_frame',
+        'app.profile.samples.other',
+        'app.profile.time.other',
+    }
+
+
+def test_overhead_is_bounded(stats):
+    profiler = SamplingProfiler(stats, interval=0.01, max_overhead=0.01)
+    profiler._adjust(0.001)
+    assert profiler.effective_interval == pytest.approx(0.1)
+    profiler._adjust(0)
+    assert profiler.effective_interval == 0.01
+
+
+def test_invalid_options(stats):
+    with pytest.raises(ValueError):
+        SamplingProfiler(stats, by='line')
+    with pytest.raises(ValueError):
+        SamplingProfiler(stats, mode='tracing')
+
+
+@pytest.mark.parametrize('mode', ['thread', 'signal'])
+def test_profiles(mode, stats, client):
+    with SamplingProfiler(stats, interval=0.005, mode=mode, max_overhead=0.5):
+        spin(0.3)
+
+    assert client.total('app.profile.samples.tests_test_profiler-spin') > 5
+    assert 0 < client.total('app.profile.time.tests_test_profiler-spin') < 1
+
+
+def test_signal_mode_needs_the_main_thread(stats):
+    profiler = SamplingProfiler(stats, mode='signal')
+    errors = []
+
+    def start():
+        try:
+            profiler.start()
+        except RuntimeError as error:
+            errors.append(error)
+
+    thread = Thread(target=start)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1
+
+
+def test_signal_samples_are_skipped_while_reporting(stats, client):
+    profiler = SamplingProfiler(stats)
+    with profiler._lock:
+        profiler.sample([leaf_frame()], blocking=False)
+    assert profiler.skipped == 1
+
+    profiler.sample([leaf_frame()], blocking=False)
+    assert profiler.report() == 1
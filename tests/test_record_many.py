@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from array import array
+
+# External Libraries
+from measure import (
+    Counter,
+    CounterDict,
+    Gauge,
+    Meter,
+    Stats,
+    Timer,
+    TimerDict,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.pystatsd import PyStatsdClient
+from measure.vectors import (
+    group,
+    summarize,
+)
+from mock import (
+    MagicMock,
+    Mock,
+)
+import pytest
+
+
+@pytest.fixture(params=[list, lambda values: array('d', values)], ids=['list', 'array'])
+def container(request):
+    return request.param
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats(
+        'prefix',
+        Counter('c', 'cdoc'),
+        Meter('m', 'mdoc'),
+        Gauge('g', 'gdoc'),
+        Timer('t', 'tdoc'),
+        CounterDict('cd', 'cddoc'),
+        TimerDict('td', 'tddoc'),
+        client=client,
+    )
+
+
+def test_counter(client, stats, container):
+    stats.c.record_many(container([1, 2, 3]))
+    client.update_stats.assert_called_once_with('prefix.c', 6, sample_rate=1)
+
+
+def test_meter_can_not_go_negative(stats):
+    with pytest.raises(NotImplementedError):
+        stats.m.record_many([1, -3])
+
+
+def test_gauge(client, stats, container):
+    stats.g.record_many(container([1, 2, 3]))
+    client.gauge.assert_called_once_with('prefix.g', 3, sample_rate=1)
+
+
+def test_timer(client, stats, container):
+    values = container([0.1, 0.2])
+    stats.t.record_many(values)
+    client.timing_many.assert_called_once_with('prefix.t', values, sample_rate=1)
+
+
+def test_empty(client, stats):
+    stats.c.record_many([])
+    stats.t.record_many([])
+    assert not client.mock_calls
+
+
+def test_timer_in_batch(client, stats):
+    with stats.batch():
+        stats.t.record_many([0.1, 0.2])
+        stats.t.record_many([0.3])
+
+    assert client.apply_many.call_args[0][0] == [
+        Metric('timing_many', 'prefix.t', [0.1, 0.2], 1),
+        Metric('timing_many', 'prefix.t', [0.3], 1),
+    ]
+
+
+def test_batched_values_are_copied(client, stats, container):
+    values = container([0.1, 0.2])
+    with stats.batch():
+        stats.t.record_many(values)
+        # the caller reuses its buffer before the batch is sent
+        values[0] = 9
+
+    assert list(client.apply_many.call_args[0][0][0].value) == [0.1, 0.2]
+
+
+def test_statdict_pairs(client, stats):
+    stats.cd.record_many([('a', 1), ('b', 2), ('a', 3)])
+    assert client.update_stats.call_args_list[0][0] == ('prefix.cd.a', 4)
+    assert client.update_stats.call_args_list[1][0] == ('prefix.cd.b', 2)
+
+
+def test_statdict_keys_and_values(client, stats):
+    stats.td.record_many(['a', 'b', 'a'], [0.1, 0.2, 0.3])
+    assert client.timing_many.call_args_list[0][0] == ('prefix.td.a', [0.1, 0.3])
+    assert client.timing_many.call_args_list[1][0] == ('prefix.td.b', [0.2])
+
+
+def test_numpy():
+    numpy = pytest.importorskip('numpy')
+
+    assert summarize(numpy.array([3.0, 1.0, 2.0])) == (3, 6.0, 1.0, 3.0)
+
+    groups = group(numpy.array(['b', 'a', 'b']), numpy.array([1, 2, 3]))
+    assert [(key, values.tolist()) for key, values in groups] == [('b', [1, 3]), ('a', [2])]
+
+
+def test_default_timing_many():
+    client = BaseClient()
+    client.timing = Mock()
+    client.timing_many('t', [1, 2])
+    assert client.timing.call_count == 2
+
+
+def test_pystatsd_timing_many():
+    client = PyStatsdClient(resolve_interval=None)
+    client.client.udp_sock = Mock()
+
+    client.timing_many('t', array('d', [0.5, 1.5]))
+
+    client.client.udp_sock.sendto.assert_called_once_with(b't:0.500000|ms\nt:1.500000|ms', client.resolver.address)
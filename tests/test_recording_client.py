@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# External Libraries
+from measure import (
+    Counter,
+    Gauge,
+    Stats,
+    Timer,
+)
+from measure.client import RecordingClient
+from measure.client.base import Metric
+from measure.tags import intern_tags
+import pytest
+
+
+@pytest.fixture
+def client():
+    return RecordingClient(capacity=4)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats('app', Counter('requests', 'doc'), Timer('latency', 'doc'), Gauge('queue', 'doc'), client=client)
+
+
+def test_records_emissions(stats, client):
+    for _ in range(3):
+        stats.requests.increment()
+    stats.latency.record_many([0.5, 1.5])
+    stats.queue.set(7)
+
+    assert len(client) == client.recorded == 6
+    assert client.names() == {'app.requests', 'app.latency', 'app.queue'}
+    assert client.count('app.requests') == 3
+    assert client.total('app.requests', 'update_stats') == 3
+    assert client.summary('app.latency') == (2, 2.0, 0.5, 1.5)
+    assert client.last('app.queue') == 7
+    assert client.last('app.missing') is None
+    client.assert_recorded('app.requests', 'update_stats', count=3, total=3)
+
+
+def test_emissions(client):
+    tags = intern_tags({'region': 'us'})
+    client.apply_many([Metric('gauge', 'a', 1, 1, tags), Metric('send', 'b', 'user-1', 1)])
+
+    first, second = client.emissions()
+    assert first[:3] == ('gauge', 'a', 1.0)
+    assert first.tags is tags
+    assert second.function == 'send'
+    assert client.emissions('b') == [second]
+
+
+def test_unique_set_members(client):
+    for member in ['x', 'y', 'x', 3]:
+        client.send('users', member)
+    assert client.unique('users') == 3
+
+
+def test_grows(client):
+    for i in range(10):
+        client.update_stats('n', i)
+    assert len(client) == 10
+    assert list(client.select_values('n')) == list(range(10))
+
+
+def test_ring():
+    client = RecordingClient(capacity=4, ring=True, timestamps=False)
+    for i in range(10):
+        client.update_stats('n', i)
+
+    assert len(client) == 4
+    assert client.recorded == 10
+    assert list(client.select_values('n')) == [6, 7, 8, 9]
+    assert client.emissions()[0].timestamp == 0
+
+    client.clear()
+    assert len(client) == 0
+
+
+def test_assert_recorded(client):
+    client.update_stats('n', 1)
+
+    with pytest.raises(AssertionError, match='was not recorded'):
+        client.assert_recorded('m')
+    with pytest.raises(AssertionError, match='1 times, not 2'):
+        client.assert_recorded('n', count=2)
+    with pytest.raises(AssertionError, match='totals 1.0, not 3'):
+        client.assert_recorded('n', total=3)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import gc
+import socket
+from threading import Event
+from time import sleep
+
+# External Libraries
+from measure.client.resolver import (
+    CachedResolver,
+    Refresher,
+    ResolvingSocket,
+)
+from mock import (
+    Mock,
+    patch,
+)
+import pytest
+
+
+def addrinfo(ip):
+    return [(socket.AF_INET, socket.SOCK_DGRAM, 17, '', (ip, 8125))]
+
+
+@pytest.fixture
+def getaddrinfo():
+    with patch('socket.getaddrinfo', return_value=addrinfo('10.0.0.1')) as getaddrinfo:
+        yield getaddrinfo
+
+
+@pytest.fixture
+def resolver(getaddrinfo):
+    return CachedResolver('statsd.svc', 8125, refresh_interval=None)
+
+
+def test_resolves_once(resolver, getaddrinfo):
+    assert resolver.address == ('10.0.0.1', 8125)
+    assert resolver.address == ('10.0.0.1', 8125)
+    assert getaddrinfo.call_count == 1
+
+
+def test_seeded_address_does_not_resolve(getaddrinfo):
+    resolver = CachedResolver('statsd.svc', 8125, refresh_interval=None, address=('10.0.0.9', 8125))
+    assert resolver.address == ('10.0.0.9', 8125)
+    assert not getaddrinfo.called
+
+
+def test_refresh(resolver, getaddrinfo):
+    getaddrinfo.return_value = addrinfo('10.0.0.2')
+    resolver.refresh()
+    assert resolver.address == ('10.0.0.2', 8125)
+
+
+def test_refresh_failure_keeps_address(resolver, getaddrinfo):
+    getaddrinfo.side_effect = socket.gaierror('nope')
+    resolver.refresh()
+    assert resolver.address == ('10.0.0.1', 8125)
+
+
+def test_socket_sends_to_cached_address(resolver):
+    sock = Mock()
+    ResolvingSocket(sock, resolver).sendto(b'a:1|c', ('ignored', 1))
+    sock.sendto.assert_called_with(b'a:1|c', ('10.0.0.1', 8125))
+
+
+def test_socket_error_refreshes(resolver):
+    sock = Mock()
+    sock.sendto.side_effect = socket.error('unreachable')
+    resolver.refresh_async = Mock()
+
+    with pytest.raises(socket.error):
+        ResolvingSocket(sock, resolver).sendto(b'a:1|c')
+
+    assert resolver.refresh_async.called
+
+
+def test_refresh_async_runs_one_refresh_at_a_time(resolver, getaddrinfo):
+    release = Event()
+    getaddrinfo.side_effect = lambda *args: release.wait() and addrinfo('10.0.0.2')
+
+    for _ in range(50):
+        resolver.refresh_async()
+    release.set()
+
+    # the lock is released once the refresh is done
+    for _ in range(100):
+        if resolver._refreshing.acquire(False):
+            break
+        sleep(0.01)
+    assert getaddrinfo.call_count == 2
+    assert resolver.address == ('10.0.0.2', 8125)
+
+
+def test_refresher_is_shared_and_holds_resolvers_weakly(getaddrinfo):
+    refresher = Refresher()
+    refresher.tick = 0.01
+    with patch('measure.client.resolver._refresher', refresher):
+        resolvers = [CachedResolver('statsd-{0}'.format(i), 8125, refresh_interval=0.01) for i in range(3)]
+        thread = refresher._thread
+
+        getaddrinfo.return_value = addrinfo('10.0.0.2')
+        thread.join(0.2)
+        assert all(resolver.address == ('10.0.0.2', 8125) for resolver in resolvers)
+
+        resolvers[0].stop()
+        del resolvers
+        gc.collect()
+        thread.join(1)
+        assert not thread.is_alive()
+        assert refresher._thread is None
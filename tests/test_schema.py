@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import json
+
+# External Libraries
+from measure import (
+    Counter,
+    CounterDict,
+)
+from measure.client.recording import RecordingClient
+from measure.names import StatsdNamePolicy
+from measure.schema import (
+    FrozenStats,
+    SchemaError,
+    compile_schema,
+    load_schema,
+)
+import pytest
+
+
+schema = {
+    'prefix': 'app',
+    'stats': [
+        {'type': 'counter', 'name': 'requests', 'doc': 'requests served'},
+        {'type': 'timer_dict', 'name': 'latency', 'doc': 'latency by route', 'max_keys': 2, 'keys': ['index']},
+        {'type': 'histogram', 'name': 'size', 'doc': 'response size', 'buckets': [10, 100]},
+    ],
+    'children': {
+        'db': {'stats': {'query': {'type': 'timer', 'doc': 'query latency'}}},
+    },
+}
+
+
+class StatsdRecordingClient(RecordingClient):
+    name_policy = StatsdNamePolicy()
+
+
+@pytest.fixture
+def client():
+    return RecordingClient()
+
+
+@pytest.fixture
+def stats(client):
+    return compile_schema(schema, client=client)
+
+
+def test_compile(stats, client):
+    assert isinstance(stats, FrozenStats)
+    assert stats.requests.full_name == 'app.requests'
+    assert stats.children['db'].query.full_name == 'app.db.query'
+    assert stats.child('db') is stats.children['db']
+
+    stats.requests.increment()
+    stats.children['db'].query.time(0.5)
+    client.assert_recorded('app.requests', 'update_stats', count=1, total=1)
+    client.assert_recorded('app.db.query', 'timing', total=0.5)
+
+
+def test_client_functions_are_bound_once(stats, client):
+    assert stats._functions['update_stats'] == client.update_stats
+    assert stats.children['db']._functions['timing'] == client.timing
+
+
+def test_frozen(stats):
+    with pytest.raises(TypeError):
+        stats.add_stat(Counter('more', 'doc'))
+    with pytest.raises(TypeError):
+        stats.child('cache')
+    with pytest.raises(TypeError):
+        stats.child('db', Counter('more', 'doc'))
+    with pytest.raises(AttributeError):
+        stats.reqeusts
+
+
+def test_keys_are_preallocated_and_bounded(stats, client):
+    assert list(stats.latency._stats) == ['index']
+
+    stats.latency['index'].time(1)
+    stats.latency['users'].time(2)
+    stats.latency['orders'].time(3)
+    assert sorted(stats.latency._stats) == ['index', 'other', 'users']
+    client.assert_recorded('app.latency.other', 'timing', total=3)
+
+
+def test_stat_dict_max_keys():
+    stat = CounterDict('paths', 'doc', max_keys=1)
+    assert stat['a'] is not stat['b']
+    assert stat['b'] is stat['c'] is stat[CounterDict.overflow_key]
+
+
+def test_cardinality(stats):
+    assert stats.cardinality() == {
+        'app.requests': 1,
+        'app.latency': 3,
+        'app.size': 4,
+        'app.db.query': 1,
+    }
+
+
+@pytest.mark.parametrize('bad, message', [
+    ({'stats': []}, 'prefix'),
+    ({'prefix': 'app', 'stat': []}, 'unknown options stat'),
+    ({'prefix': 'app', 'stats': [{'type': 'countr', 'name': 'a', 'doc': 'doc'}]}, 'unknown type'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a'}]}, 'doc is required'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a', 'doc': 'doc', 'max_keys': 2}]}, 'unknown options'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a', 'doc': 'doc', 'sample_rate': 2}]}, 'sample_rate'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter_dict', 'name': 'a', 'doc': 'doc', 'max_keys': 0}]}, 'max_keys'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter_dict', 'name': 'a', 'doc': 'doc', 'max_keys': 1, 'keys': ['b', 'c']}]},
+     'declares 2 keys'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a', 'doc': 'doc', 'sample_rate': True}]}, 'sample_rate'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter_dict', 'name': 'a', 'doc': 'doc', 'max_keys': True}]}, 'max_keys'),
+    ({'prefix': 'app', 'stats': [{'type': 'distribution', 'name': 'a', 'doc': 'doc', 'relative_accuracy': 2}]},
+     'relative_accuracy'),
+    ({'prefix': 'app', 'stats': [{'type': 'distribution_dict', 'name': 'a', 'doc': 'doc', 'relative_accuracy': 2}]},
+     'relative_accuracy'),
+    ({'prefix': 'app', 'stats': [{'type': 'distribution', 'name': 'a', 'doc': 'doc', 'max_bins': 0}]}, 'max_bins'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a', 'doc': 'doc'}] * 2}, 'declared twice'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'db', 'doc': 'doc'}], 'children': {'db': {}}}, 'child'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'a b', 'doc': 'doc'}]}, 'invalid metric name'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'apply', 'doc': 'doc'}]}, 'reserved'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'client', 'doc': 'doc'}]}, 'reserved'),
+    ({'prefix': 'app', 'stats': [{'type': 'counter', 'name': 'children', 'doc': 'doc'}]}, 'reserved'),
+    ({'prefix': 'app', 'children': {'db': {'stats': [{'type': 'counter', 'name': 'flush', 'doc': 'doc'}]}}},
+     'app.db.flush: the name is reserved'),
+])
+def test_invalid_schema(bad, message):
+    with pytest.raises(SchemaError) as error:
+        compile_schema(bad, client=StatsdRecordingClient())
+    assert message in str(error.value)
+
+
+def test_runtime_keys_are_sanitized():
+    client = StatsdRecordingClient()
+    stats = compile_schema({
+        'prefix': 'app',
+        'stats': [{'type': 'counter_dict', 'name': 'paths', 'doc': 'doc', 'keys': ['/']}],
+    }, client=client)
+
+    stats.paths['/users/me'].increment()
+    assert sorted(stats.paths._stats) == ['/', '/users/me']
+    client.assert_recorded('app.paths._users_me', 'update_stats', count=1)
+
+
+def test_load_json(tmpdir, client):
+    path = tmpdir.join('stats.json')
+    path.write(json.dumps(schema))
+
+    stats = compile_schema(load_schema(str(path)), client=client)
+    assert stats.children['db'].query.full_name == 'app.db.query'
+
+    path.write('{"prefix": ')
+    with pytest.raises(SchemaError):
+        load_schema(str(path))
+
+
+def test_load_yaml(tmpdir):
+    yaml = pytest.importorskip('yaml')
+    path = tmpdir.join('stats.yaml')
+    path.write(yaml.safe_dump(schema))
+    assert load_schema(str(path)) == schema
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from threading import Thread
+
+# External Libraries
+from measure import (
+    Counter,
+    CounterDict,
+    Gauge,
+    Meter,
+    Stats,
+    Timer,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.stats.shard import (
+    CounterShards,
+    GaugeShards,
+)
+from mock import MagicMock
+import pytest
+
+
+def run_threads(target, n=8):
+    threads = [Thread(target=target, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats(
+        'prefix',
+        Counter('c', 'cdoc', aggregate=True),
+        Meter('m', 'mdoc', aggregate=True),
+        Gauge('g', 'gdoc', aggregate=True),
+        CounterDict('cd', 'cddoc', aggregate=True),
+        client=client,
+    )
+
+
+def test_counter_shards_are_exact():
+    shards = CounterShards()
+
+    def work(i):
+        for _ in range(10000):
+            shards.record(1)
+
+    run_threads(work)
+    assert shards.collect() == 80000
+    assert shards.collect() is None
+
+    shards.record(5)
+    assert shards.collect() == 5
+
+
+def test_counter_shards_fold_dead_threads():
+    shards = CounterShards()
+    run_threads(lambda i: shards.record(i))
+    shards.collect()
+    assert not shards._cells
+    assert shards.base == sum(range(8))
+
+
+def test_gauge_shards_keep_newest():
+    shards = GaugeShards()
+    assert shards.collect() is None
+
+    run_threads(lambda i: shards.record(i), n=1)
+    shards.record(42)
+    assert shards.collect() == 42
+    assert shards.collect() is None
+
+
+def test_aggregated_stats_only_send_on_flush(client, stats):
+    stats.c.increment(3)
+    stats.c.decrement()
+    stats.m.mark()
+    stats.g.set(1)
+    stats.g.set(7)
+    stats.cd['x'].increment()
+
+    assert not client.update_stats.called
+    assert not client.gauge.called
+
+    assert stats.flush() == 4
+    assert sorted(client.apply_many.call_args[0][0]) == sorted([
+        Metric('update_stats', 'prefix.c', 2, 1),
+        Metric('update_stats', 'prefix.m', 1, 1),
+        Metric('gauge', 'prefix.g', 7, 1),
+        Metric('update_stats', 'prefix.cd.x', 1, 1),
+    ])
+
+    client.reset_mock()
+    assert stats.flush() == 0
+    assert not client.apply_many.called
+
+
+def test_aggregated_totals_are_sent_unsampled(client):
+    stats = Stats(
+        'prefix',
+        Counter('c', 'cdoc', sample_rate=0.1, aggregate=True),
+        Gauge('g', 'gdoc', sample_rate=0.5, aggregate=True),
+        client=client,
+    )
+    stats.c.increment(5)
+    stats.g.set(3)
+
+    stats.flush()
+    assert sorted(client.apply_many.call_args[0][0]) == sorted([
+        Metric('update_stats', 'prefix.c', 5, 1),
+        Metric('gauge', 'prefix.g', 3, 1),
+    ])
+
+
+def test_timer_can_not_aggregate():
+    with pytest.raises(TypeError):
+        Timer('t', 'tdoc', aggregate=True)
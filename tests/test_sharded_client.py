@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+from threading import Thread
+
+# External Libraries
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.sharded import (
+    HashRing,
+    ShardedClient,
+    parse_endpoint,
+)
+from mock import Mock
+import pytest
+
+
+def client_class(host, port):
+    return Mock(spec=BaseClient, name='{0}:{1}'.format(host, port))
+
+
+@pytest.fixture
+def endpoints():
+    return ['statsd-{0}:8125'.format(i) for i in range(4)]
+
+
+@pytest.fixture
+def client(endpoints):
+    return ShardedClient(endpoints, client_class=client_class)
+
+
+@pytest.fixture
+def names():
+    return ['prefix.stat_{0}'.format(i) for i in range(1000)]
+
+
+@pytest.mark.parametrize('endpoint, expected', [
+    ('localhost:8125', ('localhost', 8125)),
+    ('localhost', ('localhost', 8125)),
+    (('localhost', '1234'), ('localhost', 1234)),
+])
+def test_parse_endpoint(endpoint, expected):
+    assert parse_endpoint(endpoint) == expected
+
+
+def test_ring_empty():
+    with pytest.raises(LookupError):
+        HashRing().get('foo')
+
+
+def test_ring_routes_while_nodes_change(names):
+    ring = HashRing(['a', 'b', 'c'], replicas=20)
+    errors = []
+
+    def churn():
+        for _ in range(200):
+            ring.remove('c')
+            ring.add('c')
+
+    def route():
+        try:
+            for _ in range(5):
+                for name in names:
+                    assert ring.get(name) in ('a', 'b', 'c')
+        except Exception as error:
+            errors.append(error)
+
+    threads = [Thread(target=churn), Thread(target=route)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(ring) == 3
+
+
+def test_routes_are_stable(client, names):
+    routes = [client.route(name) for name in names]
+    assert routes == [client.route(name) for name in names]
+    assert len(set(map(id, routes))) == 4
+
+
+def test_removing_endpoint_remaps_only_its_names(client, endpoints, names):
+    before = dict((name, client.route(name)) for name in names)
+    removed = client.clients['statsd-0:8125']
+
+    client.remove_endpoint(endpoints[0])
+
+    for name in names:
+        if before[name] is not removed:
+            assert client.route(name) is before[name]
+        else:
+            assert client.route(name) is not removed
+
+
+def test_adding_endpoint_remaps_few_names(client, names):
+    before = dict((name, client.route(name)) for name in names)
+    client.add_endpoint('statsd-4:8125')
+    moved = [name for name in names if client.route(name) is not before[name]]
+
+    assert moved
+    assert len(moved) < len(names) / 2
+    assert all(client.route(name) is client.clients['statsd-4:8125'] for name in moved)
+
+
+@pytest.mark.parametrize('function', ['timing', 'update_stats', 'gauge', 'send'])
+def test_dispatch(client, function):
+    getattr(client, function)('prefix.stat', 42, sample_rate=1)
+    getattr(client.route('prefix.stat'), function).assert_called_with('prefix.stat', 42, sample_rate=1)
+
+
+def test_apply_many_groups_by_route(client, names):
+    metrics = [Metric('update_stats', name, 1, 1) for name in names]
+    client.apply_many(metrics)
+
+    sent = []
+    for shard in client.clients.values():
+        assert shard.apply_many.call_count == 1
+        batch = shard.apply_many.call_args[0][0]
+        assert all(client.route(metric.name) is shard for metric in batch)
+        sent.extend(batch)
+
+    assert sorted(sent) == sorted(metrics)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import os
+import signal
+import socket
+import time
+from threading import Event
+
+# External Libraries
+from measure import (
+    Counter,
+    Histogram,
+    Stats,
+)
+from measure import shutdown
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from mock import (
+    MagicMock,
+    Mock,
+)
+import pytest
+
+
+@pytest.fixture
+def client():
+    client = MagicMock(spec=BaseClient)
+    client.flush.return_value = 0
+    client.close.return_value = 0
+    return client
+
+
+@pytest.fixture
+def stats(client):
+    stats = Stats('prefix', Counter('c', 'doc', aggregate=True), client=client)
+    yield stats
+    shutdown.unregister(stats)
+
+
+def test_flush_with_timeout(stats, client):
+    stats.c.increment(2)
+
+    assert stats.flush(timeout=1) == 1
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'prefix.c', 2, 1, None)])
+    client.flush.assert_called_once_with(pytest.approx(1, abs=0.1))
+    assert stats._dropped == 0
+
+
+def test_flush_gives_up_at_the_deadline(stats, client):
+    release = Event()
+    client.apply_many.side_effect = lambda metrics: release.wait(5)
+    stats.c.increment()
+
+    start = time.time()
+    assert stats.flush(timeout=0.05) == 0
+    assert time.time() - start < 1
+    assert stats._dropped == 1
+    release.set()
+
+
+def test_flush_counts_what_the_client_could_not_send(stats, client):
+    client.flush.return_value = 3
+    stats.flush(timeout=1)
+    assert stats._dropped == 3
+
+
+def test_close(client):
+    stats = Stats('prefix', Counter('c', 'doc', aggregate=True), client=client, flush_interval=60)
+    stats.c.increment()
+
+    assert stats in shutdown._registry
+    assert stats.close(timeout=1) == 0
+    assert stats._closed
+    assert stats.flusher._stopped.is_set()
+    assert stats not in shutdown._registry
+    client.apply_many.assert_called_once_with([Metric('update_stats', 'prefix.c', 1, 1, None)])
+
+    assert stats.close() == 0
+    assert client.apply_many.call_count == 1
+    client.close.assert_not_called()
+
+
+def test_drain_closes_stats_then_each_client_once(client, monkeypatch):
+    monkeypatch.setattr(shutdown, '_registry', shutdown.WeakSet())
+    first = Stats('first', Counter('c', 'doc', aggregate=True), client=client)
+    second = Stats('second', Counter('c', 'doc', aggregate=True), client=client)
+    first.c.increment()
+    second.c.increment()
+    client.close.return_value = 2
+
+    assert shutdown.drain(timeout=1) == 2
+    assert first._closed and second._closed
+    assert client.apply_many.call_count == 2
+    client.close.assert_called_once_with(pytest.approx(1, abs=0.1))
+
+
+def test_drain_never_hangs(client, monkeypatch):
+    monkeypatch.setattr(shutdown, '_registry', shutdown.WeakSet())
+    release = Event()
+    client.close.side_effect = lambda timeout: release.wait(5)
+    stats = Stats('prefix', client=client)
+
+    start = time.time()
+    shutdown.drain(timeout=0.05)
+    assert time.time() - start < 1
+    assert stats._closed
+    release.set()
+
+
+def test_signal_handler_drains_then_calls_previous_handler(monkeypatch):
+    drain = Mock(return_value=0)
+    previous = Mock()
+    monkeypatch.setattr(shutdown, 'drain', drain)
+    original = signal.signal(signal.SIGUSR1, previous)
+    try:
+        shutdown.install_signal_handlers([signal.SIGUSR1], timeout=2)
+        os.kill(os.getpid(), signal.SIGUSR1)
+    finally:
+        signal.signal(signal.SIGUSR1, original)
+
+    drain.assert_called_once_with(2)
+    assert previous.call_args[0][0] == signal.SIGUSR1
+
+
+def test_flush_never_waits_on_a_held_stat_lock(client):
+    stats = Stats('prefix', Histogram('h', 'doc', buckets=[1]), client=client)
+    stats.h.observe(1)
+
+    # e.g. a signal handler interrupting the thread that is observing
+    with stats.h._lock:
+        start = time.time()
+        assert stats.close(timeout=0.05) == 0
+        assert time.time() - start < 1
+
+    # the abandoned worker collects once the lock is free, but never sends
+    for _ in range(100):
+        if stats._dropped:
+            break
+        time.sleep(0.01)
+    assert stats._dropped == 3  # le_1, le_inf and sum
+    assert not client.apply_many.called
+
+
+def test_drain_counts_unsent_batches(client, monkeypatch):
+    monkeypatch.setattr(shutdown, '_registry', shutdown.WeakSet())
+    stats = Stats('prefix', Counter('c', 'doc'), client=client)
+
+    batch = stats.batch()
+    with batch:
+        stats.c.increment()
+        stats.c.increment()
+        assert shutdown.drain(timeout=1) == 1
+    assert shutdown.drain(timeout=1) == 0
+
+
+def test_pystatsd_client_sends_after_close():
+    from measure.client.pystatsd import PyStatsdClient
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5)
+    client = PyStatsdClient('127.0.0.1', receiver.getsockname()[1], resolve_interval=None)
+
+    assert client.close(timeout=1) == 0
+    client.apply_many([Metric('update_stats', 'after', 1, 1)])
+    assert receiver.recv(100) == b'after:1|c'
+    receiver.close()
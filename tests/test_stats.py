@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 
 # Standard Library
+import sys
 from contextlib import contextmanager
 
 
@@ -345,3 +346,200 @@ class StatMixins(ClientTest):
     def test_missing_stat___getitem__(self, stats):
         # should not raise an exception
         stats['q'].mark()
+
+
+@pytest.mark.parametrize('stat_class', [
+    Counter,
+    Gauge,
+    Meter,
+    Timer,
+    # the Python 2 mapping ABCs have no __slots__
+    pytest.param(CounterDict, marks=pytest.mark.skipif(sys.version_info < (3,), reason='python 3 only')),
+    pytest.param(TimerDict, marks=pytest.mark.skipif(sys.version_info < (3,), reason='python 3 only')),
+])
+def test_stats_are_slotted(stat_class):
+    stat = stat_class('name', 'doc')
+    assert not hasattr(stat, '__dict__')
+
+
+def test_statdict_mapping():
+    try:
+        from collections.abc import MutableMapping
+    except ImportError:
+        from collections import MutableMapping
+
+    statdict = TimerDict('name', 'doc')
+    child = statdict['a']
+
+    assert isinstance(statdict, MutableMapping)
+    assert child.doc is statdict.doc
+    assert statdict['a'] is child
+    assert 'a' in statdict and 'b' not in statdict
+    assert list(statdict) == ['a']
+    assert len(statdict) == 1
+    assert statdict.get('b') is None
+    assert list(statdict.keys()) == ['a']
+    assert list(statdict.items()) == [('a', child)]
+    assert list(statdict.values()) == [child]
+
+
+def test_statdict_mutable_mapping_methods():
+    statdict = TimerDict('name', 'doc')
+    a, b = statdict['a'], statdict['b']
+    other = Timer('other', 'doc')
+
+    # only [] creates stats
+    assert statdict.pop('missing', None) is None
+    assert statdict.setdefault('c', other) is other
+    assert statdict.setdefault('a', other) is a
+    assert 'missing' not in statdict
+
+    statdict.update({'d': other})
+    assert statdict == {'a': a, 'b': b, 'c': other, 'd': other}
+    assert statdict.pop('d') is other
+    assert len(statdict) == 3
+
+    statdict.clear()
+    assert len(statdict) == 0 and statdict.get('a') is None
+
+
+def test_stats_keep_equal_statdicts():
+    stats = Stats('prefix', CounterDict('a', 'doc'), CounterDict('b', 'doc'), client=MagicMock(spec=BaseClient))
+    assert [stat.name for stat in stats.stats] == ['a', 'b']
+
+
+class TestMissingStats(ClientTest):
+
+    @pytest.fixture
+    def stats(self, client):
+        return Stats('prefix', Meter('m', 'mdoc'), client=client)
+
+    def test_missing_stat_is_shared(self, stats):
+        assert stats.q is stats.q
+        assert stats['q'] is stats.q
+        assert isinstance(stats.q['a'], FakeStat)
+        assert stats.q is not stats.r
+
+    def test_missing_stat_logs_once_per_interval(self, stats):
+        from mock import patch
+
+        with patch('measure.stats.logger') as logger:
+            for _ in range(5):
+                stats.missing_once.mark()
+            assert logger.error.call_count == 1
+            assert logger.error.call_args[0][1] == 'prefix.missing_once'
+
+            with patch('measure.stats.time', return_value=float('inf')):
+                stats.missing_once.mark()
+            assert logger.error.call_count == 2
+            assert logger.error.call_args[0][2] == 4
+
+    def test_missing_stat_keys_send_nothing(self, stats, client):
+        child = stats.missing['k']
+        assert isinstance(child, FakeStat)
+
+        child.time(0.5)
+        stats.missing['k'].increment()
+        stats.missing.observe(1)
+        stats.missing.record(2)
+        stats.missing.record_many([1, 2])
+        assert not client.mock_calls
+
+    def test_missing_stat_keys_are_not_kept(self, stats):
+        for i in range(100):
+            stats.missing[i].increment()
+        assert not stats.missing._stats
+
+    def test_missing_stats_are_bounded(self, stats):
+        from mock import patch
+
+        with patch('measure.stats.stat.max_fake_stats', 10), patch('measure.stats.logger'):
+            for i in range(25):
+                stats['dynamic_{0}'.format(i)].mark()
+            assert len(stats._fake_stats) <= 10
+
+    def test_reported_names_are_bounded(self, stats):
+        from mock import patch
+
+        with patch('measure.stats.max_reported', 10), patch('measure.stats.logger'):
+            for i in range(25):
+                getattr(stats, 'typo_{0}'.format(i)).mark()
+
+            from measure.stats import _reported
+            assert len(_reported) <= 10
+
+    def test_strict(self, client):
+        stats = Stats('prefix', Meter('m', 'mdoc'), client=client, strict=True)
+        stats.m.mark()
+
+        with pytest.raises(AttributeError):
+            stats.q
+
+        with pytest.raises(AttributeError):
+            stats['q']
+
+    def test_dunder_names_are_not_stats(self, stats):
+        assert not hasattr(stats, '__html__')
+
+    def test_stats_named_like_bookkeeping(self, client):
+        stats = Stats('prefix', Counter('dropped', 'doc'), Counter('closed', 'doc'), Counter('tags', 'doc'),
+                      client=client, tags={'region': 'us'})
+        stats.dropped.increment()
+        stats.closed.increment()
+        assert stats.child('db')._tags == stats._tags
+        assert stats.close() == 0
+
+
+class TestChildStats(ClientTest):
+
+    @pytest.fixture
+    def stats(self, client):
+        return Stats('app', Counter('requests', 'doc', aggregate=True), client=client, tags={'region': 'us'})
+
+    def test_child_names(self, stats, client):
+        db = stats.child('db', Meter('queries', 'doc'))
+        db.child('replica', Meter('queries', 'doc')).queries.mark()
+        db.queries.mark()
+
+        assert db.prefix == 'app.db'
+        assert db.client is client
+        assert db.queries.full_name == 'app.db.queries'
+        assert [call[0][0] for call in client.update_stats.call_args_list] == ['app.db.replica.queries', 'app.db.queries']
+
+    def test_child_is_shared(self, stats):
+        db = stats.child('db', Meter('queries', 'doc'))
+        assert stats.child('db', Timer('latency', 'doc')) is db
+        assert db.queries.name == 'queries'
+        assert db.latency.full_name == 'app.db.latency'
+
+    def test_child_tags_and_strict(self, client):
+        stats = Stats('app', client=client, tags={'region': 'us'}, strict=True)
+        db = stats.child('db', Meter('queries', 'doc'), tags={'role': 'primary'})
+
+        assert db.queries.tags is stats.child('db')._tags
+        assert dict(db._tags.tags) == {'region': 'us', 'role': 'primary'}
+        with pytest.raises(AttributeError):
+            db.missing
+
+    def test_parent_flushes_children(self, stats, client):
+        from measure.client.base import Metric
+
+        stats.child('db', Counter('queries', 'doc', aggregate=True)).queries.increment(3)
+        stats.requests.increment()
+
+        assert stats.flush() == 2
+        tags = stats._tags
+        client.apply_many.assert_called_once_with([
+            Metric('update_stats', 'app.requests', 1, 1, tags),
+            Metric('update_stats', 'app.db.queries', 3, 1, tags),
+        ])
+
+    def test_children_have_no_flusher(self, client):
+        from measure import shutdown
+
+        stats = Stats('app', client=client, flush_interval=60)
+        db = stats.child('db')
+
+        assert db.flusher is None
+        assert db not in shutdown._registry
+        stats.close()
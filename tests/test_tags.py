@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# Standard Library
+import gc
+
+# External Libraries
+from measure import (
+    Counter,
+    CounterDict,
+    Stats,
+    Timer,
+)
+from measure.client.base import (
+    BaseClient,
+    Metric,
+)
+from measure.client.pystatsd import PyStatsdClient
+from measure.tags import (
+    _interned,
+    intern_tags,
+    merge_tags,
+)
+from mock import (
+    MagicMock,
+    Mock,
+)
+import pytest
+
+
+@pytest.fixture
+def client():
+    return MagicMock(spec=BaseClient)
+
+
+@pytest.fixture
+def stats(client):
+    return Stats(
+        'prefix',
+        Counter('plain', 'doc'),
+        Counter('c', 'doc', tags={'endpoint': 'home'}),
+        CounterDict('status', 'doc', tag_name='status', tags={'endpoint': 'home'}),
+        Timer('t', 'doc', tags={'region': 'eu'}),
+        client=client,
+        tags={'region': 'us'},
+    )
+
+
+def test_interning():
+    tags = intern_tags({'b': 2, 'a': 1})
+    assert tags is intern_tags([('a', 1), ('b', 2)])
+    assert intern_tags(tags) is tags
+    assert intern_tags({}) is None
+    assert tags.statsd == '|#a:1,b:2'
+    assert tags.dimensions == [{'Name': 'a', 'Value': '1'}, {'Name': 'b', 'Value': '2'}]
+
+
+def test_merge():
+    a = intern_tags({'a': 1, 'b': 1})
+    b = intern_tags({'b': 2})
+    assert merge_tags(a, b) is intern_tags({'a': 1, 'b': 2})
+    assert merge_tags(a, b) is merge_tags(a, b)
+    assert merge_tags(None, b) is b
+    assert merge_tags(a, None) is a
+
+
+def test_stat_tags(client, stats):
+    stats.c.increment()
+    client.update_stats.assert_called_with(
+        'prefix.c', 1, sample_rate=1, tags=intern_tags({'region': 'us', 'endpoint': 'home'}))
+
+    stats.t.time(1)
+    client.timing.assert_called_with('prefix.t', 1, sample_rate=1, tags=intern_tags({'region': 'eu'}))
+
+
+def test_stats_tags_only(client, stats):
+    stats.plain.increment()
+    client.update_stats.assert_called_with('prefix.plain', 1, sample_rate=1, tags=intern_tags({'region': 'us'}))
+
+
+def test_untagged_stats_send_no_tags(client):
+    Stats('prefix', Counter('c', 'doc'), client=client).c.increment()
+    client.update_stats.assert_called_with('prefix.c', 1, sample_rate=1)
+
+
+def test_tag_name(client, stats):
+    stats.status[200].increment()
+    assert stats.status[200].name == 'status'
+    client.update_stats.assert_called_with(
+        'prefix.status', 1, sample_rate=1, tags=intern_tags({'region': 'us', 'endpoint': 'home', 'status': 200}))
+
+
+def test_batch_keeps_tag_sets_apart(client, stats):
+    with stats.batch():
+        stats.status[200].increment()
+        stats.status[500].increment()
+        stats.status[200].increment()
+
+    assert [(m.value, dict(m.tags)['status']) for m in client.apply_many.call_args[0][0]] == [(2, 200), (1, 500)]
+
+
+def test_pystatsd_suffix():
+    client = PyStatsdClient(resolve_interval=None)
+    client.client.udp_sock = Mock()
+
+    client.update_stats('c', 1, tags=intern_tags({'region': 'us'}))
+    client.apply_many([Metric('timing', 't', 0.5, 0.5, intern_tags({'a': None}))])
+
+    packets = [call[0][0] for call in client.client.udp_sock.sendto.call_args_list]
+    assert packets[0] == b'c:1|c|#region:us'
+    assert packets[1:] in ([], [b't:0.500000|ms|@0.5|#a'])
+
+
+def test_statsd_suffix_is_sanitized():
+    tags = intern_tags({'path|x': '/a,b#c', 'host:port': 'db:5432', 'note': 'two words'})
+    assert tags.statsd == '|#host_port:db_5432,note:two_words,path_x:/a_b_c'
+    # dimensions keep the values as they are
+    assert {'Name': 'host:port', 'Value': 'db:5432'} in tags.dimensions
+
+
+def test_unused_tag_sets_are_dropped():
+    size = len(_interned)
+    base = intern_tags({'base': 1})
+    for i in range(100):
+        merge_tags(base, intern_tags({'request': i}))
+    gc.collect()
+
+    assert len(_interned) <= size + 1
+    assert len(base._merged) == 0
+
+
+def test_pystatsd_set_with_tags():
+    client = PyStatsdClient(resolve_interval=None)
+    client.client.udp_sock = Mock()
+
+    client.send('users', 42, tags=intern_tags({'region': 'us'}))
+    client.send('users', 43)
+
+    packets = [call[0][0] for call in client.client.udp_sock.sendto.call_args_list]
+    assert packets == [b'users:42|s|#region:us', b'users:43|s']